@@ -3,15 +3,16 @@ import sys
 import json
 import base64
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
 import functions_framework
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build, Resource
-from googleapiclient.errors import HttpError
-from bs4 import BeautifulSoup
 from urllib.parse import unquote
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
+
 from config import AlertConfig
 from database import FirestoreDatabase
 
@@ -25,27 +26,46 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-class GmailService:
-    """Gmail API client for reading and moving alert mails."""
+# Process-wide Gmail client cache, kept across warm invocations
+_gmail_service: Optional["Resource"] = None
+_gmail_credentials: Optional["Credentials"] = None
+_gmail_lock = threading.Lock()
 
-    def __init__(self) -> None:
-        try:
+
+def get_gmail_service() -> "Resource":
+    """Return the cached Gmail API service, building it on first use.
+
+    Uses the static discovery document bundled with google-api-python-client.
+    The Google client libraries are imported here rather than at module
+    load. On warm invocations only the token expiry is checked.
+    """
+    global _gmail_service, _gmail_credentials
+    with _gmail_lock:
+        if _gmail_service is None:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
             token_env: Optional[str] = os.environ.get("GMAIL_TOKEN_JSON")
-            if token_env:
-                logger.debug("Gmail: using env token.")
-                token_data: Dict[str, Any] = json.loads(token_env)
-                creds: Credentials = Credentials.from_authorized_user_info(token_data, AlertConfig.SCOPES)
-            else:
+            if not token_env:
                 logger.error("Gmail token is missing.")
                 raise RuntimeError("GMAIL_TOKEN_JSON environment variable is missing but required.")
+            logger.debug("Gmail: using env token.")
+            token_data: Dict[str, Any] = json.loads(token_env)
+            _gmail_credentials = Credentials.from_authorized_user_info(token_data, AlertConfig.SCOPES)
+            _gmail_service = build('gmail', 'v1', credentials=_gmail_credentials, static_discovery=True, cache_discovery=False)
+            logger.debug("Gmail client built (cold start).")
+        if _gmail_credentials.expired and _gmail_credentials.refresh_token:
+            from google.auth.transport.requests import Request
+            _gmail_credentials.refresh(Request())
+            logger.info("Gmail token refreshed.")
+        return _gmail_service
 
-            self.service: Resource = build('gmail', 'v1', credentials=creds)
 
-            profile = self.service.users().getProfile(userId='me').execute()
-            logger.info(f"Gmail connected: {profile.get('emailAddress')}")
-        except HttpError as e:
-            logger.error(f"Gmail HTTP error: {e}")
-            raise RuntimeError(f"Gmail Connection failed (HTTP Error): {e}")
+class GmailService:
+    """Gmail API client for reading and moving alert mails."""
+
+    def __init__(self) -> None:
+        try:
+            self.service: "Resource" = get_gmail_service()
         except Exception as e:
             logger.error(f"Gmail connection failed: {e}")
             raise RuntimeError(f"Gmail Connection failed: {str(e)}")
@@ -143,6 +163,8 @@ class AlertProcessor:
 
     def process_config(self, config: Dict[str, str]) -> Dict[str, Any]:
         """Process one alert config: fetch mails, extract links, save & move."""
+        from bs4 import BeautifulSoup
+
         result: Dict[str, Any] = {"name": config["name"], "messages_processed": 0, "status": "ok", "error": None}
         logger.info(f"Processing alert: {config['name']}")
 
@@ -9,8 +9,6 @@ pro Feed in Firestore gespeichert und beim nächsten Lauf wiederverwendet.
 
 import time
 from urllib.parse import urlparse
-from mastodon import Mastodon
-from bs4 import BeautifulSoup
 from config import Config
 
 # Importiere shared modules (lokal + Cloud)
@@ -26,6 +24,16 @@ class MastodonService:
         self.entry_limit = Config.ENTRY_LIMIT
         self.fetch_all_since_last = getattr(Config, "FETCH_ALL_SINCE_LAST", True)
         self.repo = FirestoreRepository()
+        # Mastodon-Clients pro Instanz, erst beim ersten Feed der Instanz erstellt
+        self._clients = {}
+
+    def _client(self, instance_url: str):
+        """Gibt den Mastodon-Client für eine Instanz zurück (lazy, wiederverwendet)."""
+        if instance_url not in self._clients:
+            # Mastodon.py erst bei Bedarf importieren (kürzerer Kaltstart)
+            from mastodon import Mastodon
+            self._clients[instance_url] = Mastodon(api_base_url=instance_url)
+        return self._clients[instance_url]
 
     def _fetch_mode(self) -> str:
         return "FULL_SYNC" if self.fetch_all_since_last else "LIMITED_SYNC"
@@ -97,7 +105,7 @@ class MastodonService:
         """
         logger.info(f"[{feed_name}] Verarbeite Feed @{username} auf {instance_url}...")
 
-        mastodon = Mastodon(api_base_url=instance_url)
+        mastodon = self._client(instance_url)
 
         # Account anhand Username suchen
         account_domain = urlparse(instance_url).netloc
@@ -182,6 +190,8 @@ class MastodonService:
         Returns:
             Tupel aus Liste der neuen Links und Anzahl aufgetretener Fehler
         """
+        from bs4 import BeautifulSoup
+
         new_links = []
         error_count = 0
         
@@ -0,0 +1,190 @@
+"""
+Process-wide client registry for the podcast pipeline.
+
+Cloud Functions reuse the Python process across warm invocations, so the
+TTS, Storage, Gmail, Gemini and Firestore clients are built once and kept
+in `clients`. Service-account credentials are parsed once; the Google
+transports refresh their access tokens on expiry, and the Gmail OAuth
+token is refreshed in place instead of rebuilding the service. Build
+times and invocation counts are recorded for startup/latency logging.
+The client libraries themselves are imported in the factories, so a run
+that never needs TTS, Gemini or Gmail does not pay for loading them.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from database import FirestoreDatabase
+
+if TYPE_CHECKING:
+    from google.oauth2 import service_account
+    from google.oauth2.credentials import Credentials
+
+# Logger Setup
+logger = logging.getLogger("podcast_generator")
+logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "DEBUG").upper(), logging.DEBUG))
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+
+class GCPAuthService:
+    """Zentrale Authentifizierung fuer GCP-Dienste (TTS, Storage, Gmail, Gemini)."""
+
+    @staticmethod
+    def get_credentials() -> "service_account.Credentials":
+        """Load SA credentials from env or local file."""
+        from google.oauth2 import service_account
+        secret_env: str = "RSS_FIREBASE_KEY"
+        if secret_env in os.environ:
+            return service_account.Credentials.from_service_account_info(json.loads(os.environ[secret_env]))
+        key_path: str = os.path.join(os.path.dirname(__file__), "keys", "serviceAccountKey.json")
+        return service_account.Credentials.from_service_account_file(key_path)
+
+    @staticmethod
+    def get_gemini_api_key() -> str:
+        """Get Gemini API key from env."""
+        key: Optional[str] = os.getenv("GEMINI_API_KEY")
+        if not key:
+            raise RuntimeError("GEMINI_API_KEY environment variable is missing.")
+        return key.strip()
+
+    @staticmethod
+    def _load_gmail_credentials() -> "Credentials":
+        """Load Gmail OAuth credentials from token secret or local token file."""
+        from google.oauth2.credentials import Credentials
+        scopes = ["https://www.googleapis.com/auth/gmail.modify"]
+        token_json_str: Optional[str] = os.environ.get("GMAIL_TOKEN_JSON")
+        creds: Optional[Credentials] = None
+
+        if token_json_str:
+            try:
+                creds_info = json.loads(token_json_str)
+                creds = Credentials.from_authorized_user_info(creds_info, scopes)
+            except Exception as exc:
+                logger.error(f"Invalid GMAIL_TOKEN_JSON: {exc}")
+
+        if creds is None:
+            local_token_paths = [
+                os.path.join(os.path.dirname(__file__), "keys", "token.json"),
+                os.path.join(os.path.dirname(__file__), "..", "..", "keys", "token.json"),
+            ]
+            for token_path in local_token_paths:
+                if os.path.exists(token_path):
+                    creds = Credentials.from_authorized_user_file(token_path, scopes)
+                    break
+
+        if not creds:
+            raise RuntimeError("No Gmail token found. Set GMAIL_TOKEN_JSON or provide keys/token.json.")
+        return creds
+
+    @staticmethod
+    def _ensure_valid(creds: "Credentials") -> None:
+        """Refresh the token only when it has expired."""
+        if creds.valid:
+            return
+        if creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+            logger.info("Gmail token refreshed.")
+        else:
+            raise RuntimeError("Gmail token is invalid and cannot be refreshed.")
+
+
+class ClientRegistry:
+    """Builds each client once per process and records how long that took."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Any] = {}
+        self._gmail_credentials: Optional["Credentials"] = None
+        self.build_ms: Dict[str, float] = {}
+        self.created_at: float = time.monotonic()
+        self.invocations: int = 0
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                started = time.perf_counter()
+                client = factory()
+                self._clients[name] = client
+                self.build_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+                logger.info(f"Client built: {name} in {self.build_ms[name]:.0f} ms.")
+            return client
+
+    def begin_invocation(self) -> bool:
+        """Count an invocation; returns True on the first one (cold start)."""
+        with self._lock:
+            self.invocations += 1
+            cold: bool = self.invocations == 1
+        logger.info(
+            f"Invocation #{self.invocations} ({'cold' if cold else 'warm'} start, "
+            f"process age {time.monotonic() - self.created_at:.0f}s, cached clients: {sorted(self._clients) or '-'})."
+        )
+        return cold
+
+    def credentials(self) -> "service_account.Credentials":
+        """Service-account credentials, parsed once (tokens refresh on use)."""
+        return self._get("credentials", GCPAuthService.get_credentials)
+
+    def tts_client(self) -> Any:
+        def factory() -> Any:
+            from google.cloud import texttospeech
+            return texttospeech.TextToSpeechClient(credentials=self.credentials())
+        return self._get("tts", factory)
+
+    def storage_client(self) -> Any:
+        def factory() -> Any:
+            from google.cloud import storage
+            return storage.Client(credentials=self.credentials(), project=self.credentials().project_id)
+        return self._get("storage", factory)
+
+    def genai_client(self) -> Any:
+        def factory() -> Any:
+            from google import genai
+            return genai.Client(api_key=GCPAuthService.get_gemini_api_key())
+        return self._get("genai", factory)
+
+    def database(self) -> FirestoreDatabase:
+        return self._get("firestore", FirestoreDatabase)
+
+    def gmail_service(self) -> Any:
+        """Gmail API service (static discovery document); token refreshed in place when expired."""
+        with self._lock:
+            if "gmail" in self._clients:
+                GCPAuthService._ensure_valid(self._gmail_credentials)
+                return self._clients["gmail"]
+
+            def factory() -> Any:
+                from googleapiclient.discovery import build
+                creds = GCPAuthService._load_gmail_credentials()
+                GCPAuthService._ensure_valid(creds)
+                self._gmail_credentials = creds
+                return build("gmail", "v1", credentials=creds, static_discovery=True, cache_discovery=False)
+
+            return self._get("gmail", factory)
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop one cached client (or all), e.g. after a revoked token.
+
+        Resetting Gmail also drops its OAuth credentials, so the next client
+        is built from a freshly loaded token.
+        """
+        with self._lock:
+            if name is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(name, None)
+            if name in (None, "gmail"):
+                self._gmail_credentials = None
+
+
+clients = ClientRegistry()
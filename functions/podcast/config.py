@@ -34,18 +34,58 @@ class PodcastConfig:
     MAX_OUTPUT_TOKENS = 65536
     MAX_CONTENT_CHARS = 15000
 
+    # ── Quellen laden ─────────────────────────────────────
+    # Web-Seiten parallel laden (Worst Case ~ ein Timeout statt LIMIT × Timeout)
+    FETCH_MAX_WORKERS = int(os.environ.get("FETCH_MAX_WORKERS", "20"))
+    FETCH_TIMEOUT_SECONDS = 15
+
+    # YouTube-Zusammenfassungen über Gemini in eigenem, kleinerem Pool
+    YOUTUBE_MAX_CONCURRENCY = int(os.environ.get("YOUTUBE_MAX_CONCURRENCY", "3"))
+    YOUTUBE_CALL_TIMEOUT_SECONDS = 180
+
+    # Gemeinsamer Inhalts-Cache mit sendmail (Firestore, Key = Hash der kanonischen URL)
+    CONTENT_CACHE_COLLECTION = "content_cache"
+    CONTENT_CACHE_FRESH_HOURS = 24
+    CONTENT_CACHE_TTL_DAYS = 7
+    CONTENT_CACHE_MAX_CHARS = 50000
+
     # ── TTS ───────────────────────────────────────────────
     TTS_LANGUAGE = "de-DE"
     TTS_HOST_VOICE = "de-DE-Journey-D"
     TTS_GUEST_VOICE = "de-DE-Journey-F"
     TTS_SAMPLE_RATE = 44100
 
+    # Parallele TTS-Aufrufe, Quota (Requests/Minute) und Wiederholungen pro Passage
+    TTS_MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", "8"))
+    TTS_REQUESTS_PER_MINUTE = int(os.environ.get("TTS_REQUESTS_PER_MINUTE", "300"))
+    TTS_MAX_RETRIES = 3
+
+    # Cache synthetisierter Passagen im Podcast-Bucket (Key = Hash aus Text, Stimme,
+    # Sprache, Sample-Rate, Encoding); Aufräumen per Lifecycle-Regel auf dem Prefix
+    TTS_CACHE_ENABLED = os.environ.get("TTS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    TTS_CACHE_PREFIX = "tts_cache/"
+
+    # Chunk-Größe des Resumable-Uploads (Vielfaches von 256 KiB)
+    UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024
+
     # ── Script-Validierung ────────────────────────────────
     TTS_WORDS_PER_MINUTE = 140
     MIN_PODCAST_MINUTES = 15
     MAX_PODCAST_MINUTES = 25
     MAX_SCRIPT_RETRIES = 2
 
+    # "map_reduce" = ein Abschnitt pro Quelle (parallel) + Intro/Übergänge,
+    # "single" = ein einziger Aufruf für das ganze Skript,
+    # "stream" = ein Aufruf per Streaming, TTS startet mit der ersten fertigen Passage
+    SCRIPT_MODE = os.environ.get("SCRIPT_MODE", "map_reduce")
+    SCRIPT_MAX_WORKERS = int(os.environ.get("SCRIPT_MAX_WORKERS", "5"))
+    SEGMENT_MIN_MINUTES = 1.0
+    # Abschnitt gilt als zu kurz unter diesem Anteil der Ziel-Wortzahl
+    SEGMENT_MIN_RATIO = 0.7
+    SEGMENT_MAX_RETRIES = 2
+    SEGMENT_MAX_OUTPUT_TOKENS = 8192
+    SEGMENT_PREVIEW_CHARS = 300
+
     # ── Signed URL ────────────────────────────────────────
     # GCS erlaubt max. 7 Tage für V4-Signed-URLs
     SIGNED_URL_EXPIRY_DAYS = 7
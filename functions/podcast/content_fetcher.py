@@ -0,0 +1,205 @@
+"""
+Concurrent web page fetching with a shared Firestore content cache.
+
+Pages are fetched through one pooled `requests.Session` on a thread pool,
+so the worst case is roughly one request timeout instead of one per URL.
+Extracted text is cached in the Firestore collection `content_cache`,
+keyed by the canonical URL. The sendmail function writes to the same
+collection with the same extractor (`content_extractor.py` is identical in
+both functions), so articles it already scraped are not downloaded again.
+Entries written by a different `EXTRACTOR_VERSION` count as misses. Stale entries are revalidated with a conditional GET (ETag /
+Last-Modified).
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse, urlunparse, parse_qs, parse_qsl, unquote, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import PodcastConfig
+
+# Logger Setup
+logger = logging.getLogger("podcast_generator")
+logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "DEBUG").upper(), logging.DEBUG))
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+REQUEST_HEADERS: Dict[str, str] = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+# Must match sendmail/helpers.py so both functions share cache keys
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "si"}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for cache keys (same rules as sendmail/helpers.py)."""
+    if not url:
+        return url
+    url = url.strip().rstrip(":")
+    parsed = urlparse(url)
+    if "google." in parsed.netloc and parsed.path == "/url":
+        qs = parse_qs(parsed.query)
+        target = qs.get("url") or qs.get("q")
+        if target:
+            return canonical_url(unquote(target[0]))
+
+    scheme = (parsed.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    netloc = parsed.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunparse((scheme, netloc, path, "", query, ""))
+
+
+def content_cache_key(url: str) -> str:
+    """Firestore document ID for a URL in `content_cache`."""
+    return hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=PodcastConfig.FETCH_MAX_WORKERS,
+                pool_maxsize=PodcastConfig.FETCH_MAX_WORKERS,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(REQUEST_HEADERS)
+            _session = session
+    return _session
+
+
+class ContentFetcher:
+    """Fetches page text concurrently, backed by the shared content cache."""
+
+    def __init__(self, db: Optional[Any] = None) -> None:
+        self.db = db
+
+    @staticmethod
+    def _is_fresh(document: Dict[str, Any], now: datetime) -> bool:
+        fetched_at: Optional[datetime] = document.get("fetched_at")
+        if fetched_at is None:
+            return False
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return now - fetched_at < timedelta(hours=PodcastConfig.CONTENT_CACHE_FRESH_HOURS)
+
+    @staticmethod
+    def _cache_document(url: str, text: str, response: requests.Response, now: datetime) -> Dict[str, Any]:
+        from content_extractor import EXTRACTOR_VERSION
+        return {
+            "url": canonical_url(url),
+            "extractor": EXTRACTOR_VERSION,
+            "text": text[:PodcastConfig.CONTENT_CACHE_MAX_CHARS],
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "expires_at": now + timedelta(days=PodcastConfig.CONTENT_CACHE_TTL_DAYS),
+        }
+
+    def _fetch_one(self, url: str, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Fetch one page; revalidate a stale cache entry with a conditional GET."""
+        headers: Dict[str, str] = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            res = get_session().get(url, headers=headers, timeout=PodcastConfig.FETCH_TIMEOUT_SECONDS)
+            now = datetime.now(timezone.utc)
+            if res.status_code == 304 and cached:
+                logger.debug(f"  -> not modified: {url}")
+                return {**cached, "fetched_at": now,
+                        "expires_at": now + timedelta(days=PodcastConfig.CONTENT_CACHE_TTL_DAYS)}
+            res.raise_for_status()
+            from content_extractor import extract_main_text
+            text: str = extract_main_text(res.content)
+            if not text:
+                return None
+            return self._cache_document(url, text, res, now)
+        except Exception as e:
+            logger.error(f"Fetch failed ({url}): {e}")
+            return None
+
+    def _load_cache(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read cache entries; entries from another extractor version are skipped."""
+        if self.db is None or not keys:
+            return {}
+        try:
+            documents: Dict[str, Dict[str, Any]] = self.db.get_content_cache(keys)
+        except Exception as e:
+            logger.warning(f"Content cache read failed: {e}")
+            return {}
+        from content_extractor import EXTRACTOR_VERSION
+        return {key: doc for key, doc in documents.items() if doc.get("extractor") == EXTRACTOR_VERSION}
+
+    def _store_cache(self, documents: Dict[str, Dict[str, Any]]) -> None:
+        if self.db is None or not documents:
+            return
+        try:
+            self.db.set_content_cache(documents)
+        except Exception as e:
+            logger.warning(f"Content cache write failed: {e}")
+
+    def fetch_texts(self, urls: List[str]) -> Dict[str, str]:
+        """Return `{url: text}` for all URLs with usable content."""
+        if not urls:
+            return {}
+        now = datetime.now(timezone.utc)
+        keys: Dict[str, str] = {url: content_cache_key(url) for url in urls}
+        cached: Dict[str, Dict[str, Any]] = self._load_cache(sorted(set(keys.values())))
+
+        texts: Dict[str, str] = {}
+        to_fetch: List[str] = []
+        for url in urls:
+            document = cached.get(keys[url])
+            if document and document.get("text") and self._is_fresh(document, now):
+                texts[url] = document["text"]
+            else:
+                to_fetch.append(url)
+        logger.info(f"Content cache: {len(texts)}/{len(urls)} hits, fetching {len(to_fetch)} pages.")
+
+        if to_fetch:
+            max_workers = max(1, min(PodcastConfig.FETCH_MAX_WORKERS, len(to_fetch)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda u: self._fetch_one(u, cached.get(keys[u])), to_fetch))
+
+            updates: Dict[str, Dict[str, Any]] = {}
+            for url, document in zip(to_fetch, results):
+                if document is None:
+                    continue
+                texts[url] = document["text"]
+                updates[keys[url]] = document
+            self._store_cache(updates)
+
+        return texts
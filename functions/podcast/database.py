@@ -23,6 +23,10 @@ if not logger.handlers:
 class FirestoreDatabase:
     """Firestore access layer for the podcast pipeline."""
 
+    # Limits per WriteBatch: document count and estimated payload (below the 10 MiB request limit)
+    BATCH_MAX_DOCS: int = 500
+    BATCH_MAX_BYTES: int = 8 * 1024 * 1024
+
     def __init__(self) -> None:
         try:
             key_json: Optional[str] = os.environ.get("RSS_FIREBASE_KEY")
@@ -44,105 +48,53 @@ class FirestoreDatabase:
             logger.error(f"Firestore connection failed: {e}")
             raise RuntimeError(f"Firestore Connection failed: {str(e)}")
 
-    @staticmethod
-    def _parse_timestamp(ts: Any) -> Optional[datetime]:
-        """Parse various timestamp formats to UTC datetime."""
-        if ts is None:
-            return None
-        if isinstance(ts, datetime):
-            if ts.tzinfo is None:
-                return ts.replace(tzinfo=timezone.utc)
-            return ts
-        if isinstance(ts, str):
-            for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
-                try:
-                    dt: datetime = datetime.strptime(ts, fmt)
-                    return dt.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
-            logger.warning(f"Unknown timestamp format: {ts}")
-        return None
-
     def fetch_entries(self) -> List[Tuple[Any, Dict[str, Any]]]:
-        """Fetch unprocessed entries per config. Returns (ref, data) tuples."""
-        candidates: List[Tuple[Any, Dict[str, Any]]] = []
-
-        # Mastodon
-        if PodcastConfig.SOURCES.get("mastodon"):
-            logger.info("Querying source=mastodon...")
-            query = self.db.collection("website").where("source", "==", "mastodon").stream()
-            for doc in query:
-                data: Dict[str, Any] = doc.to_dict()
-                if data.get("podcast_generated", False):
-                    continue
-                if PodcastConfig.SOURCES["mastodon"] != ["*"]:
-                    if data.get("feed") not in PodcastConfig.SOURCES["mastodon"]:
-                        continue
-                candidates.append((doc.reference, data))
-            logger.info(f"Mastodon: {len(candidates)} candidates.")
-
-        # Alerts
-        if PodcastConfig.SOURCES.get("alerts"):
-            count_before: int = len(candidates)
-            logger.info("Querying source=alerts...")
-            query = self.db.collection("website").where("source", "==", "alerts").stream()
-            for doc in query:
-                data: Dict[str, Any] = doc.to_dict()
-                if data.get("podcast_generated", False):
-                    continue
-                if PodcastConfig.SOURCES["alerts"] != ["*"]:
-                    if data.get("feed") not in PodcastConfig.SOURCES["alerts"]:
-                        continue
-                candidates.append((doc.reference, data))
-            logger.info(f"Alerts: {len(candidates) - count_before} candidates.")
-
-        # RSS
-        if PodcastConfig.SOURCES.get("rss"):
-            count_before: int = len(candidates)
-            logger.info("Querying source=rss...")
-            query = self.db.collection("website").where("source", "==", "rss").stream()
-            for doc in query:
-                data: Dict[str, Any] = doc.to_dict()
-                if data.get("podcast_generated", False):
-                    continue
-                if PodcastConfig.SOURCES["rss"] != ["*"]:
-                    if data.get("feed") not in PodcastConfig.SOURCES["rss"]:
-                        continue
-                candidates.append((doc.reference, data))
-            logger.info(f"RSS: {len(candidates) - count_before} candidates.")
-
-        # Deduplicate
-        seen_ids: set = set()
-        unique: List[Tuple[Any, Dict[str, Any]]] = []
-        for ref, data in candidates:
-            if ref.id not in seen_ids:
-                seen_ids.add(ref.id)
-                unique.append((ref, data))
-        candidates = unique
-
-        # Time window
+        """Fetch unprocessed entries per config, newest first. Returns (ref, data) tuples.
+
+        One indexed query (podcast_generated == False, source in [...],
+        order_by time_stamp desc) replaces the per-source full scans; see
+        firestore.indexes.json. Without feed filters the query itself is
+        limited, otherwise feeds are filtered while streaming and the stream
+        stops after LIMIT matches.
+        """
+        sources: Dict[str, List[str]] = {
+            source: feeds for source, feeds in PodcastConfig.SOURCES.items() if feeds
+        }
+        if not sources:
+            logger.info("No sources enabled.")
+            return []
+
+        query = (
+            self.db.collection("website")
+            .where("podcast_generated", "==", False)
+            .where("source", "in", list(sources))
+        )
         if PodcastConfig.TIME_WINDOW_HOURS is not None:
             cutoff: datetime = datetime.now(timezone.utc) - timedelta(hours=PodcastConfig.TIME_WINDOW_HOURS)
-            filtered: List[Tuple[Any, Dict[str, Any]]] = []
-            for ref, data in candidates:
-                ts: Optional[datetime] = self._parse_timestamp(data.get("time_stamp"))
-                if ts is None or ts >= cutoff:
-                    filtered.append((ref, data))
-            logger.info(f"Time filter ({PodcastConfig.TIME_WINDOW_HOURS}h): {len(candidates)} -> {len(filtered)}.")
-            candidates = filtered
-
-        # Sort newest first
-        candidates.sort(
-            key=lambda x: self._parse_timestamp(x[1].get("time_stamp")) or datetime.min.replace(tzinfo=timezone.utc),
-            reverse=True
+            query = query.where("time_stamp", ">=", cutoff)
+        query = query.order_by("time_stamp", direction=firestore.Query.DESCENDING)
+
+        feed_filtered: bool = any(feeds != ["*"] for feeds in sources.values())
+        if not feed_filtered:
+            query = query.limit(PodcastConfig.LIMIT)
+        logger.info(
+            f"Querying sources={list(sources)} (limit {PodcastConfig.LIMIT}"
+            f"{', feed filter while streaming' if feed_filtered else ''})..."
         )
 
-        # Limit
-        if len(candidates) > PodcastConfig.LIMIT:
-            logger.info(f"Limit applied: {len(candidates)} -> {PodcastConfig.LIMIT}.")
-            candidates = candidates[:PodcastConfig.LIMIT]
-
-        logger.info(f"Selected {len(candidates)} entries.")
+        candidates: List[Tuple[Any, Dict[str, Any]]] = []
+        scanned: int = 0
+        for doc in query.stream():
+            scanned += 1
+            data: Dict[str, Any] = doc.to_dict()
+            feeds: List[str] = sources.get(data.get("source"), [])
+            if feeds != ["*"] and data.get("feed") not in feeds:
+                continue
+            candidates.append((doc.reference, data))
+            if len(candidates) >= PodcastConfig.LIMIT:
+                break
+
+        logger.info(f"Selected {len(candidates)} entries ({scanned} docs read).")
         return candidates
 
     def mark_as_podcast_generated(self, doc_refs: List[Any]) -> None:
@@ -163,3 +115,46 @@ class FirestoreDatabase:
         except Exception as e:
             logger.error(f"Batch update failed: {e}")
             raise
+
+    def get_content_cache(self, doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read several content_cache docs in one round trip."""
+        if not doc_ids:
+            return {}
+        collection = self.db.collection(PodcastConfig.CONTENT_CACHE_COLLECTION)
+        refs = [collection.document(doc_id) for doc_id in doc_ids]
+        return {doc.id: doc.to_dict() or {} for doc in self.db.get_all(refs) if doc.exists}
+
+    @classmethod
+    def _estimate_size(cls, value: Any) -> int:
+        """Rough Firestore storage size of a value in bytes."""
+        if isinstance(value, str):
+            return len(value.encode("utf-8")) + 1
+        if isinstance(value, bytes):
+            return len(value)
+        if isinstance(value, dict):
+            return sum(len(str(key).encode("utf-8")) + 1 + cls._estimate_size(item) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return sum(cls._estimate_size(item) for item in value)
+        if value is None or isinstance(value, bool):
+            return 1
+        return 8
+
+    def set_content_cache(self, documents: Dict[str, Dict[str, Any]]) -> None:
+        """Batch-write content_cache docs, split by document count and payload size."""
+        if not documents:
+            return
+        collection = self.db.collection(PodcastConfig.CONTENT_CACHE_COLLECTION)
+        batch = self.db.batch()
+        batch_docs: int = 0
+        batch_bytes: int = 0
+        for doc_id, data in documents.items():
+            size: int = len(doc_id) + 32 + self._estimate_size(data)
+            if batch_docs and (batch_docs >= self.BATCH_MAX_DOCS or batch_bytes + size > self.BATCH_MAX_BYTES):
+                batch.commit()
+                batch = self.db.batch()
+                batch_docs, batch_bytes = 0, 0
+            batch.set(collection.document(doc_id), data)
+            batch_docs += 1
+            batch_bytes += size
+        batch.commit()
+        logger.debug(f"Content cache: {len(documents)} docs written.")
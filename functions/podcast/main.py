@@ -1,26 +1,30 @@
+import time
+
+# Startup instrumentation: module import time (cold start only)
+_IMPORT_STARTED: float = time.perf_counter()
+
 import os
 import re
 import sys
 import json
 import base64
+import itertools
 import logging
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from urllib.parse import urlparse, parse_qs
 
 import functions_framework
-from google.cloud import texttospeech, storage
-from google.oauth2 import service_account
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-
-from google import genai
-from google.genai import types
 
 from config import PodcastConfig
+from clients import clients
 from database import FirestoreDatabase
+from content_fetcher import ContentFetcher
+from tts_engine import TTSEngine
+from tts_cache import TTSCache
+from script_stream import JsonArrayStreamParser
 
 # Logger Setup
 logger = logging.getLogger("podcast_generator")
@@ -31,71 +35,22 @@ if not logger.handlers:
     handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
     logger.addHandler(handler)
 
-
-class GCPAuthService:
-    """Zentrale Authentifizierung fuer GCP-Dienste (TTS, Storage, Gmail, Gemini)."""
-
-    @staticmethod
-    def get_credentials() -> service_account.Credentials:
-        """Load SA credentials from env or local file."""
-        secret_env: str = "RSS_FIREBASE_KEY"
-        if secret_env in os.environ:
-            return service_account.Credentials.from_service_account_info(json.loads(os.environ[secret_env]))
-        key_path: str = os.path.join(os.path.dirname(__file__), "keys", "serviceAccountKey.json")
-        return service_account.Credentials.from_service_account_file(key_path)
-
-    @staticmethod
-    def get_gemini_api_key() -> str:
-        """Get Gemini API key from env."""
-        key: Optional[str] = os.getenv("GEMINI_API_KEY")
-        if not key:
-            raise RuntimeError("GEMINI_API_KEY environment variable is missing.")
-        return key.strip()
-
-    @staticmethod
-    def get_gmail_service() -> Any:
-        """Build Gmail API service from token secret or local token file."""
-        scopes = ["https://www.googleapis.com/auth/gmail.modify"]
-        token_json_str: Optional[str] = os.environ.get("GMAIL_TOKEN_JSON")
-        creds: Optional[Credentials] = None
-
-        if token_json_str:
-            try:
-                creds_info = json.loads(token_json_str)
-                creds = Credentials.from_authorized_user_info(creds_info, scopes)
-            except Exception as exc:
-                logger.error(f"Invalid GMAIL_TOKEN_JSON: {exc}")
-
-        if creds is None:
-            local_token_paths = [
-                os.path.join(os.path.dirname(__file__), "keys", "token.json"),
-                os.path.join(os.path.dirname(__file__), "..", "..", "keys", "token.json"),
-            ]
-            for token_path in local_token_paths:
-                if os.path.exists(token_path):
-                    creds = Credentials.from_authorized_user_file(token_path, scopes)
-                    break
-
-        if not creds:
-            raise RuntimeError("No Gmail token found. Set GMAIL_TOKEN_JSON or provide keys/token.json.")
-
-        if not creds.valid:
-            if creds.expired and creds.refresh_token:
-                from google.auth.transport.requests import Request
-                creds.refresh(Request())
-            else:
-                raise RuntimeError("Gmail token is invalid and cannot be refreshed.")
-
-        return build("gmail", "v1", credentials=creds)
+IMPORT_MS: float = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+logger.debug(f"Module imports: {IMPORT_MS:.0f} ms.")
 
 
 class PodcastAIService:
     """Fetches web content and generates podcast scripts via Gemini."""
 
-    def __init__(self, api_key: str) -> None:
-        self.client: genai.Client = genai.Client(api_key=api_key)
+    def __init__(self, db: Optional[FirestoreDatabase] = None) -> None:
+        self.fetcher: ContentFetcher = ContentFetcher(db)
         logger.info("PodcastAIService initialized.")
 
+    @property
+    def client(self) -> Any:
+        """Gemini client from the registry, built on first use (not on the no-entries path)."""
+        return clients.genai_client()
+
     def _clean_youtube_url(self, url: str) -> str:
         """Normalize YouTube URL variants."""
         url = url.strip().rstrip(":")
@@ -108,51 +63,63 @@ class PodcastAIService:
                 return f"https://www.youtube.com/watch?v={qs['v'][0]}"
         return url
 
+    def _summarise_youtube(self, url: str) -> Optional[str]:
+        """Summarize one YouTube video via Gemini; returns None on failure."""
+        from google.genai import types
+        logger.info(f"Fetching YT: {url}")
+        try:
+            clean_url: str = self._clean_youtube_url(url)
+            youtube_video = types.Part.from_uri(file_uri=clean_url, mime_type="video/*")
+            response = self.client.models.generate_content(
+                model=PodcastConfig.GEMINI_MODEL,
+                contents=[
+                    youtube_video,
+                    "Erstelle eine sehr ausfuehrliche, detaillierte Zusammenfassung dieses Videos. "
+                    "Nenne alle wichtigen Argumente, Fakten und Diskussionspunkte, damit daraus "
+                    "spaeter ein tiefergehender Podcast erstellt werden kann."
+                ],
+                config=types.GenerateContentConfig(
+                    http_options=types.HttpOptions(timeout=PodcastConfig.YOUTUBE_CALL_TIMEOUT_SECONDS * 1000),
+                ),
+            )
+            text: str = response.text.strip()
+            logger.info(f"  -> {len(text)} chars fetched for {url}")
+            return text
+        except Exception as e:
+            logger.error(f"YT fetch failed ({url}): {e}")
+            return None
+
     def fetch_raw_content(self, urls: List[str]) -> List[str]:
-        """Scrape web pages via BeautifulSoup and summarize YouTube videos via Gemini."""
+        """Fetch web pages and YouTube summaries concurrently.
+
+        Web pages go through the pooled `ContentFetcher` (with content cache),
+        YouTube videos through a separate, smaller pool of Gemini calls. Both
+        stages run at the same time; output order is web first, then YouTube,
+        each in input order.
+        """
         youtube_urls: List[str] = [u for u in urls if "youtube.com" in u or "youtu.be" in u]
         web_urls: List[str] = [u for u in urls if u not in youtube_urls]
 
-        content_collection: List[str] = []
-        headers: Dict[str, str] = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
+        youtube_pool = ThreadPoolExecutor(max_workers=max(1, min(PodcastConfig.YOUTUBE_MAX_CONCURRENCY, len(youtube_urls))))
+        try:
+            youtube_futures = [youtube_pool.submit(self._summarise_youtube, url) for url in youtube_urls]
+            web_texts: Dict[str, str] = self.fetcher.fetch_texts(web_urls)
+            youtube_texts: List[Optional[str]] = [future.result() for future in youtube_futures]
+        finally:
+            youtube_pool.shutdown(wait=False, cancel_futures=True)
 
+        content_collection: List[str] = []
         for url in web_urls:
-            logger.info(f"Fetching web: {url}")
-            try:
-                res = requests.get(url, headers=headers, timeout=15)
-                res.raise_for_status()
-                soup: BeautifulSoup = BeautifulSoup(res.content, 'html.parser')
-                text: str = ' '.join([p.get_text() for p in soup.find_all(['p', 'article', 'h1', 'h2', 'h3'])])
-                clean_text: str = text.replace('\n', ' ').strip()
-                char_count = len(clean_text)
-                content_collection.append(f"Quelle: {url}\nInhalt: {clean_text[:PodcastConfig.MAX_CONTENT_CHARS]}")
-                logger.info(f"  -> {char_count} chars fetched for {url}")
-            except Exception as e:
-                logger.error(f"Fetch failed ({url}): {e}")
-
-        for url in youtube_urls:
-            logger.info(f"Fetching YT: {url}")
-            try:
-                clean_url: str = self._clean_youtube_url(url)
-                youtube_video = types.Part.from_uri(file_uri=clean_url, mime_type="video/*")
-                response = self.client.models.generate_content(
-                    model=PodcastConfig.GEMINI_MODEL,
-                    contents=[
-                        youtube_video,
-                        "Erstelle eine sehr ausfuehrliche, detaillierte Zusammenfassung dieses Videos. "
-                        "Nenne alle wichtigen Argumente, Fakten und Diskussionspunkte, damit daraus "
-                        "spaeter ein tiefergehender Podcast erstellt werden kann."
-                    ]
-                )
-                text: str = response.text.strip()
-                char_count = len(text)
+            clean_text: Optional[str] = web_texts.get(url)
+            if not clean_text:
+                continue
+            content_collection.append(f"Quelle: {url}\nInhalt: {clean_text[:PodcastConfig.MAX_CONTENT_CHARS]}")
+            logger.info(f"  -> {len(clean_text)} chars fetched for {url}")
+        for url, text in zip(youtube_urls, youtube_texts):
+            if text:
                 content_collection.append(f"Quelle (YouTube): {url}\nInhalt: {text}")
-                logger.info(f"  -> {char_count} chars fetched for {url}")
-            except Exception as e:
-                logger.error(f"YT fetch failed ({url}): {e}")
 
+        logger.info(f"Fetched content for {len(content_collection)}/{len(urls)} URLs.")
         return content_collection
 
     @staticmethod
@@ -166,15 +133,222 @@ class PodcastAIService:
         total_words = sum(len(passage.split()) for passage in script)
         return total_words / PodcastConfig.TTS_WORDS_PER_MINUTE
 
+    def stream_script(self, content_collection: List[str], collect: Optional[List[str]] = None) -> Iterator[str]:
+        """Stream the script in one Gemini call and yield each passage once its JSON string is complete.
+
+        Passages are also appended to `collect`. The length cannot be retried
+        once audio has started, so a short script is only logged. If the
+        stream fails before the first passage, the script falls back to
+        `generate_script`.
+        """
+        if not content_collection:
+            logger.warning("No content for script generation.")
+            return
+        from google.genai import types
+        collected: List[str] = collect if collect is not None else []
+        content_text: str = "\n\n---\n\n".join(content_collection)
+        parser = JsonArrayStreamParser()
+        started = time.perf_counter()
+        logger.info("Streaming script via Gemini...")
+        try:
+            stream = self.client.models.generate_content_stream(
+                model=PodcastConfig.GEMINI_MODEL,
+                contents=f"Nachrichten-Rohtexte:\n{content_text}",
+                config=types.GenerateContentConfig(
+                    system_instruction=self._script_instruction(),
+                    temperature=PodcastConfig.SCRIPT_TEMPERATURE,
+                    max_output_tokens=PodcastConfig.MAX_OUTPUT_TOKENS,
+                    response_mime_type="application/json",
+                )
+            )
+            for chunk in stream:
+                for passage in parser.feed(chunk.text or ""):
+                    passage = self._strip_urls(passage)
+                    if not passage:
+                        continue
+                    if not collected:
+                        logger.info(f"First passage after {time.perf_counter() - started:.1f}s.")
+                    collected.append(passage)
+                    yield passage
+        except Exception as e:
+            if collected:
+                raise
+            logger.warning(f"Script stream failed before the first passage ({e}) – falling back to a single call.")
+            for passage in self.generate_script(content_collection):
+                collected.append(passage)
+                yield passage
+            return
+
+        if not parser.done:
+            logger.warning("Script stream ended before the closing bracket (output truncated?).")
+        estimated_min = self._estimate_duration_min(collected)
+        logger.info(
+            f"Script streamed: {len(collected)} passages, ~{estimated_min:.1f} min estimated duration, "
+            f"{time.perf_counter() - started:.1f}s."
+        )
+        if estimated_min < PodcastConfig.MIN_PODCAST_MINUTES:
+            logger.warning(f"Streamed script below target: ~{estimated_min:.1f} min (min {PodcastConfig.MIN_PODCAST_MINUTES} min).")
+
     def generate_script(self, content_collection: List[str]) -> List[str]:
-        """Generate a two-voice script via Gemini (returns JSON list) with length validation and retry."""
+        """Generate a two-voice script in the configured `SCRIPT_MODE` (non-streaming)."""
         if not content_collection:
             logger.warning("No content for script generation.")
             return []
+        if PodcastConfig.SCRIPT_MODE == "map_reduce":
+            return self._generate_script_map_reduce(content_collection)
+        # "single", also the fallback for "stream"
+        return self._generate_script_single(content_collection)
+
+    def _request_passages(self, system_instruction: str, contents: str, max_output_tokens: int) -> List[str]:
+        """One Gemini call returning a JSON array of passages (URLs stripped)."""
+        from google.genai import types
+        response = self.client.models.generate_content(
+            model=PodcastConfig.GEMINI_MODEL,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                temperature=PodcastConfig.SCRIPT_TEMPERATURE,
+                max_output_tokens=max_output_tokens,
+                response_mime_type="application/json",
+            )
+        )
+        passages = json.loads(response.text.strip())
+        if not isinstance(passages, list):
+            raise json.JSONDecodeError("Expected a JSON array", response.text, 0)
+        return [self._strip_urls(str(p)) for p in passages if self._strip_urls(str(p))]
+
+    def _generate_segment(self, index: int, content: str, target_min: float) -> List[str]:
+        """Map step: script segment for one source, regenerated alone while too short."""
+        min_words: int = int(target_min * PodcastConfig.TTS_WORDS_PER_MINUTE * PodcastConfig.SEGMENT_MIN_RATIO)
+        system_instruction: str = (
+            "Du schreibst einen Abschnitt eines deutschen Podcasts fuer zwei Moderatoren (Sprecher 1 und Sprecher 2) "
+            f"ueber genau eine Quelle. Ziel ist eine Laenge von ca. {target_min:.1f} Minuten "
+            f"(ca. {int(target_min * PodcastConfig.TTS_WORDS_PER_MINUTE)} Woerter). "
+            "Lass die Moderatoren die Inhalte diskutieren, Vor- und Nachteile abwaegen und Details aus dem Text erklaeren. "
+            "Keine Begruessung, keine Verabschiedung, keine Ueberleitung zu anderen Themen – "
+            "Intro und Uebergaenge werden separat erstellt.\n\n"
+            "WICHTIG: Gib ausschliesslich ein valides JSON-Array zurueck. Jedes Element im Array muss ein reiner String sein, der den gesprochenen Text enthaelt.\n"
+            "Der Text muss abwechselnd von Sprecher 1 und Sprecher 2 gelesen werden. Keine Rollennamen oder Praefixe (wie 'Sprecher 1:') im String. "
+            "Keine URLs im Text."
+        )
 
-        content_text: str = "\n\n---\n\n".join(content_collection)
-
+        segment: List[str] = []
+        best: List[str] = []
+        for attempt in range(1, PodcastConfig.SEGMENT_MAX_RETRIES + 1):
+            extra_hint = ""
+            if attempt > 1:
+                extra_hint = (
+                    f"\n\nWICHTIG: Der vorherige Versuch war zu kurz ({sum(len(p.split()) for p in segment)} Woerter). "
+                    f"Schreibe mindestens {min_words} Woerter. Mehr Details, NICHT abkuerzen."
+                )
+            try:
+                segment = self._request_passages(
+                    system_instruction, f"Rohtext:\n{content}{extra_hint}", PodcastConfig.SEGMENT_MAX_OUTPUT_TOKENS
+                )
+            except json.JSONDecodeError as e:
+                logger.error(f"Segment {index + 1}: invalid JSON from Gemini: {e}")
+                continue
+            words = sum(len(p.split()) for p in segment)
+            if words >= min_words:
+                logger.info(f"Segment {index + 1}: {len(segment)} passages, {words} words (attempt {attempt}).")
+                return segment
+            logger.warning(f"Segment {index + 1} too short: {words}/{min_words} words (attempt {attempt}).")
+            if words > sum(len(p.split()) for p in best):
+                best = segment
+        # Keep the longest attempt rather than dropping the source
+        return best
+
+    def _generate_frame(self, segments: List[List[str]]) -> Dict[str, List[str]]:
+        """Reduce step: intro, one transition per segment boundary and outro."""
+        from google.genai import types
+        previews: str = "\n".join(
+            f"Abschnitt {i + 1}: {' '.join(segment[:2])[:PodcastConfig.SEGMENT_PREVIEW_CHARS]}"
+            for i, segment in enumerate(segments)
+        )
         system_instruction: str = (
+            "Du rahmst einen deutschen Podcast fuer zwei Moderatoren ein, dessen Abschnitte bereits geschrieben sind. "
+            "Gib ausschliesslich ein valides JSON-Objekt mit den Schluesseln \"intro\", \"transitions\" und \"outro\" zurueck. "
+            "\"intro\": 2 kurze Passagen (Begruessung und Ueberblick ueber die Themen). "
+            f"\"transitions\": genau {max(0, len(segments) - 1)} Strings, jeweils ein kurzer Satz als Ueberleitung "
+            "vom vorherigen zum naechsten Abschnitt. "
+            "\"outro\": 2 kurze Passagen (Zusammenfassung und Verabschiedung). "
+            "Keine Rollennamen oder Praefixe, keine URLs."
+        )
+        response = self.client.models.generate_content(
+            model=PodcastConfig.GEMINI_MODEL,
+            contents=f"Abschnitte in Reihenfolge:\n{previews}",
+            config=types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                temperature=PodcastConfig.SCRIPT_TEMPERATURE,
+                max_output_tokens=PodcastConfig.SEGMENT_MAX_OUTPUT_TOKENS,
+                response_mime_type="application/json",
+            )
+        )
+        frame: Dict[str, Any] = json.loads(response.text.strip())
+        return {
+            key: [self._strip_urls(str(p)) for p in frame.get(key) or [] if self._strip_urls(str(p))]
+            for key in ("intro", "transitions", "outro")
+        }
+
+    def _generate_script_map_reduce(self, content_collection: List[str]) -> List[str]:
+        """Generate one segment per source concurrently, then stitch with intro/transitions/outro.
+
+        The total target duration is split evenly across sources, so the overall
+        length stays predictable; a short segment is regenerated on its own
+        instead of regenerating the whole script.
+        """
+        target_total: float = (PodcastConfig.MIN_PODCAST_MINUTES + PodcastConfig.MAX_PODCAST_MINUTES) / 2
+        target_min: float = max(PodcastConfig.SEGMENT_MIN_MINUTES, target_total / len(content_collection))
+        logger.info(
+            f"Generating {len(content_collection)} segments via Gemini "
+            f"(~{target_min:.1f} min each, {PodcastConfig.SCRIPT_MAX_WORKERS} workers)..."
+        )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(PodcastConfig.SCRIPT_MAX_WORKERS, len(content_collection)))) as pool:
+            futures = [
+                pool.submit(self._generate_segment, i, content, target_min)
+                for i, content in enumerate(content_collection)
+            ]
+            segments: List[List[str]] = []
+            for i, future in enumerate(futures):
+                try:
+                    segment = future.result()
+                except Exception as e:
+                    logger.error(f"Segment {i + 1} failed: {e}")
+                    continue
+                if segment:
+                    segments.append(segment)
+
+        if not segments:
+            raise RuntimeError("Script generation failed for all segments.")
+
+        try:
+            frame: Dict[str, List[str]] = self._generate_frame(segments)
+        except Exception as e:
+            logger.warning(f"Intro/transition pass failed, stitching segments without it: {e}")
+            frame = {"intro": [], "transitions": [], "outro": []}
+
+        script: List[str] = list(frame["intro"])
+        for i, segment in enumerate(segments):
+            if i > 0 and i - 1 < len(frame["transitions"]):
+                script.append(frame["transitions"][i - 1])
+            script.extend(segment)
+        script.extend(frame["outro"])
+
+        estimated_min = self._estimate_duration_min(script)
+        logger.info(
+            f"Script: {len(segments)} segments, {len(script)} passages, "
+            f"~{estimated_min:.1f} min estimated duration, {time.perf_counter() - started:.1f}s."
+        )
+        if estimated_min < PodcastConfig.MIN_PODCAST_MINUTES:
+            logger.warning(f"Script below target: ~{estimated_min:.1f} min (min {PodcastConfig.MIN_PODCAST_MINUTES} min).")
+        return script
+
+    @staticmethod
+    def _script_instruction() -> str:
+        """System instruction for generating the whole script in one call."""
+        return (
             "Du erstellst ein langes, detailliertes deutsches Podcast-Skript fuer zwei Moderatoren (Sprecher 1 und Sprecher 2) "
             f"basierend auf den uebergebenen Rohtexten. Ziel ist eine Podcast-Laenge von mindestens {PodcastConfig.MIN_PODCAST_MINUTES} "
             f"bis {PodcastConfig.MAX_PODCAST_MINUTES} Minuten. "
@@ -186,6 +360,12 @@ class PodcastAIService:
             "Keine URLs im Text."
         )
 
+    def _generate_script_single(self, content_collection: List[str]) -> List[str]:
+        """Generate the whole script in one Gemini call (returns JSON list) with length validation and retry."""
+        content_text: str = "\n\n---\n\n".join(content_collection)
+
+        system_instruction: str = self._script_instruction()
+
         script: List[str] = []
         for attempt in range(1, PodcastConfig.MAX_SCRIPT_RETRIES + 1):
             logger.info(f"Generating script via Gemini (attempt {attempt}/{PodcastConfig.MAX_SCRIPT_RETRIES})...")
@@ -199,20 +379,11 @@ class PodcastAIService:
                         "Mehr Passagen, mehr Details, NICHT abkuerzen."
                     )
 
-                response = self.client.models.generate_content(
-                    model=PodcastConfig.GEMINI_MODEL,
-                    contents=f"Nachrichten-Rohtexte:\n{content_text}{extra_hint}",
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        temperature=PodcastConfig.SCRIPT_TEMPERATURE,
-                        max_output_tokens=PodcastConfig.MAX_OUTPUT_TOKENS,
-                        response_mime_type="application/json",
-                    )
+                script = self._request_passages(
+                    system_instruction,
+                    f"Nachrichten-Rohtexte:\n{content_text}{extra_hint}",
+                    PodcastConfig.MAX_OUTPUT_TOKENS,
                 )
-                script = json.loads(response.text.strip())
-
-                # Strip URLs from each passage
-                script = [self._strip_urls(p) for p in script if self._strip_urls(p)]
 
                 estimated_min = self._estimate_duration_min(script)
                 total_words = sum(len(p.split()) for p in script)
@@ -257,52 +428,95 @@ class AudioService:
             raise RuntimeError("GCS_BUCKET_NAME environment variable is missing.")
         logger.info("AudioService initialized.")
 
-    def generate_and_upload(self, script: List[str]) -> Optional[str]:
-        """Synthesize all passages and upload the combined MP3."""
-        if not script:
+    def generate_and_upload(self, script: Iterable[str]) -> Optional[str]:
+        """Synthesize all passages and upload the combined MP3.
+
+        `script` may be a list or a generator (streaming mode); passages are
+        synthesized as they arrive.
+        """
+        passages: Iterator[str] = iter(script)
+        first: Optional[str] = next(passages, None)
+        if first is None:
             return None
 
+        from google.cloud import texttospeech
         logger.info("Starting TTS synthesis...")
-        creds: service_account.Credentials = GCPAuthService.get_credentials()
-        tts_client = texttospeech.TextToSpeechClient(credentials=creds)
+        tts_client: Any = clients.tts_client()
         audio_config = texttospeech.AudioConfig(
             audio_encoding=texttospeech.AudioEncoding.MP3,
             sample_rate_hertz=PodcastConfig.TTS_SAMPLE_RATE
         )
 
-        combined_audio: bytes = b""
-        for index, text in enumerate(script):
-            logger.debug(f"TTS passage {index + 1}/{len(script)}...")
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            voice_params = texttospeech.VoiceSelectionParams(
-                language_code=PodcastConfig.TTS_LANGUAGE,
-                name=self.VOICES[index % 2]
-            )
-            response = tts_client.synthesize_speech(
-                input=synthesis_input, voice=voice_params, audio_config=audio_config
-            )
-            combined_audio += response.audio_content
-
-        logger.info("TTS done. Uploading to GCS...")
-
-        # Fresh creds to avoid token expiry after long TTS
-        fresh_creds: service_account.Credentials = GCPAuthService.get_credentials()
-        storage_client = storage.Client(credentials=fresh_creds, project=fresh_creds.project_id)
-        bucket = storage_client.bucket(PodcastConfig.GCS_BUCKET_NAME)
+        voices: List[Any] = [
+            texttospeech.VoiceSelectionParams(language_code=PodcastConfig.TTS_LANGUAGE, name=name)
+            for name in self.VOICES
+        ]
 
+        bucket = clients.storage_client().bucket(PodcastConfig.GCS_BUCKET_NAME)
         filename: str = f"podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
         blob = bucket.blob(filename)
-        blob.upload_from_string(combined_audio, content_type="audio/mpeg")
+
+        cache: Optional[TTSCache] = TTSCache(bucket, PodcastConfig.TTS_CACHE_PREFIX) if PodcastConfig.TTS_CACHE_ENABLED else None
+
+        def cache_key(index: int, text: str) -> str:
+            return TTSCache.key_for(
+                text, self.VOICES[index % 2], PodcastConfig.TTS_LANGUAGE,
+                PodcastConfig.TTS_SAMPLE_RATE, texttospeech.AudioEncoding.MP3.name,
+            )
+
+        def lookup(index: int, text: str) -> Optional[bytes]:
+            return cache.get(cache_key(index, text))
+
+        def synthesize(index: int, text: str) -> bytes:
+            logger.debug(f"TTS passage {index + 1}...")
+            response = tts_client.synthesize_speech(
+                input=texttospeech.SynthesisInput(text=text), voice=voices[index % 2], audio_config=audio_config
+            )
+            if cache is not None:
+                cache.put(cache_key(index, text), response.audio_content)
+            return response.audio_content
+
+        # Segments are uploaded while later passages are still synthesizing
+        engine = TTSEngine(synthesize, lookup=lookup if cache is not None else None)
+        started = time.perf_counter()
+        total_bytes: int = self._stream_upload(blob, engine.run(itertools.chain([first], passages)))
+        logger.info(
+            f"TTS: {engine.passages} passages in {time.perf_counter() - started:.1f}s "
+            f"({engine.max_workers} workers, {engine.retries} retries), {total_bytes / 1e6:.1f} MB."
+        )
+        if cache is not None:
+            logger.info(f"TTS cache: {cache.hits} hits, {cache.misses} synthesized.")
 
         logger.info(f"Uploaded: gs://{PodcastConfig.GCS_BUCKET_NAME}/{filename}")
         return filename
 
+    @staticmethod
+    def _stream_upload(blob: Any, segments: Iterable[bytes]) -> int:
+        """Write audio segments into a resumable GCS upload as they arrive.
+
+        Memory stays bounded by the upload chunk size plus the segments in
+        flight. If synthesis fails, the partial object is removed.
+        """
+        writer = blob.open("wb", chunk_size=PodcastConfig.UPLOAD_CHUNK_SIZE, content_type="audio/mpeg")
+        total_bytes: int = 0
+        try:
+            for segment in segments:
+                writer.write(segment)
+                total_bytes += len(segment)
+        except Exception:
+            logger.error(f"TTS failed during upload – discarding partial file {blob.name}.")
+            try:
+                writer.close()
+                blob.delete()
+            except Exception as cleanup_error:
+                logger.warning(f"Could not remove partial upload {blob.name}: {cleanup_error}")
+            raise
+        writer.close()
+        return total_bytes
+
     def generate_signed_url(self, filename: str) -> str:
         """Generate a V4 signed URL for the uploaded MP3."""
-        creds: service_account.Credentials = GCPAuthService.get_credentials()
-        storage_client = storage.Client(credentials=creds, project=creds.project_id)
-        bucket = storage_client.bucket(PodcastConfig.GCS_BUCKET_NAME)
-        blob = bucket.blob(filename)
+        blob = clients.storage_client().bucket(PodcastConfig.GCS_BUCKET_NAME).blob(filename)
         url: str = blob.generate_signed_url(
             version="v4",
             expiration=timedelta(days=PodcastConfig.SIGNED_URL_EXPIRY_DAYS),
@@ -335,23 +549,38 @@ class PodcastMailService:
         msg["To"] = PodcastConfig.RECIPIENT_EMAIL
         msg["Subject"] = f"Neuer Podcast {datetime.now().strftime('%Y-%m-%d')}"
 
-        gmail_service = GCPAuthService.get_gmail_service()
+        gmail_service = clients.gmail_service()
         raw_message = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
         gmail_service.users().messages().send(userId="me", body={"raw": raw_message}).execute()
         logger.info(f"Podcast mail sent to {PodcastConfig.RECIPIENT_EMAIL} with signed URL for {podcast_filename}.")
 
 
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """Record the wall time of a pipeline stage in milliseconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Stage {stage}: {timings[stage]:.0f} ms.")
+
+
 @functions_framework.http
 def podcast_trigger(request: Any) -> Tuple[str, int]:
     """HTTP entry point – runs the full podcast pipeline."""
     logger.info("Starting podcast_trigger.")
+    cold_start: bool = clients.begin_invocation()
+    timings: Dict[str, float] = {}
     try:
-        db = FirestoreDatabase()
-        ai_service = PodcastAIService(GCPAuthService.get_gemini_api_key())
-        audio_service = AudioService()
-        mail_service = PodcastMailService()
+        with _timed(timings, "init"):
+            db = clients.database()
+            ai_service = PodcastAIService(db)
+            audio_service = AudioService()
+            mail_service = PodcastMailService()
 
-        candidates: List[Tuple[Any, Dict[str, Any]]] = db.fetch_entries()
+        with _timed(timings, "fetch_entries"):
+            candidates: List[Tuple[Any, Dict[str, Any]]] = db.fetch_entries()
 
         if not candidates:
             logger.info("No new entries found.")
@@ -362,17 +591,28 @@ def podcast_trigger(request: Any) -> Tuple[str, int]:
         urls: List[str] = [e.get("url") for e in entries if e.get("url")]
         logger.info(f"Processing {len(urls)} URLs.")
 
-        raw_content: List[str] = ai_service.fetch_raw_content(urls)
-        script: List[str] = ai_service.generate_script(raw_content)
-        filename: Optional[str] = audio_service.generate_and_upload(script)
+        with _timed(timings, "fetch_content"):
+            raw_content: List[str] = ai_service.fetch_raw_content(urls)
+        if PodcastConfig.SCRIPT_MODE == "stream":
+            # Script generation and TTS overlap; passages are collected as they are spoken
+            script: List[str] = []
+            with _timed(timings, "script_tts_upload"):
+                filename: Optional[str] = audio_service.generate_and_upload(ai_service.stream_script(raw_content, script))
+        else:
+            with _timed(timings, "script"):
+                script = ai_service.generate_script(raw_content)
+            with _timed(timings, "tts_upload"):
+                filename = audio_service.generate_and_upload(script)
 
         if not filename:
             raise RuntimeError("Podcast generation did not produce a file.")
 
-        signed_url: str = audio_service.generate_signed_url(filename)
-        mail_service.send_podcast_mail(filename, signed_url)
+        with _timed(timings, "mail"):
+            signed_url: str = audio_service.generate_signed_url(filename)
+            mail_service.send_podcast_mail(filename, signed_url)
 
-        db.mark_as_podcast_generated(doc_refs)
+        with _timed(timings, "mark_generated"):
+            db.mark_as_podcast_generated(doc_refs)
 
         estimated_min = PodcastAIService._estimate_duration_min(script)
         response_data: Dict[str, Any] = {
@@ -384,6 +624,10 @@ def podcast_trigger(request: Any) -> Tuple[str, int]:
                 "script_passages": len(script),
                 "estimated_duration_min": round(estimated_min, 1),
                 "mail_sent_to": PodcastConfig.RECIPIENT_EMAIL,
+                "cold_start": cold_start,
+                "timings_ms": timings,
+                "import_ms": IMPORT_MS if cold_start else 0,
+                "client_build_ms": clients.build_ms if cold_start else {},
             }
         }
         logger.info("Execution completed.")
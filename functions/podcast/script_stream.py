@@ -0,0 +1,55 @@
+"""
+Incremental parser for a streamed JSON array of strings.
+
+Gemini streams the podcast script as a JSON array (`["...", "...", ...]`)
+in arbitrary chunks. `JsonArrayStreamParser.feed` returns every string
+element as soon as its closing quote has arrived, so passages can go to
+TTS while the rest of the script is still being generated. Escapes are
+decoded with `json.loads`; text before the opening bracket (e.g. a code
+fence) is skipped.
+"""
+
+import json
+from typing import List
+
+
+class JsonArrayStreamParser:
+    """Yields the string elements of a JSON array from arbitrary text chunks."""
+
+    def __init__(self) -> None:
+        self._started: bool = False
+        self._in_string: bool = False
+        self._escape: bool = False
+        self._buffer: List[str] = []
+        self.done: bool = False
+        self.count: int = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return the strings completed by it."""
+        completed: List[str] = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    completed.append(json.loads('"' + "".join(self._buffer) + '"'))
+                    self._buffer = []
+                    self.count += 1
+                    continue
+                self._buffer.append(char)
+            elif char == '"':
+                self._in_string = True
+            elif char == "]":
+                self.done = True
+            elif char not in ", \t\r\n":
+                raise ValueError(f"Unexpected {char!r} in script stream (only strings are allowed).")
+        return completed
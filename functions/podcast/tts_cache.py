@@ -0,0 +1,73 @@
+"""
+Content-addressed cache for synthesized TTS segments in GCS.
+
+Each segment is stored as `<prefix><sha256>.mp3` in the podcast bucket.
+The key hashes the passage text together with every parameter that
+changes the audio (voice, language, sample rate, encoding). Reruns after a
+failed mail step, script retries and recurring intros/outros reuse the
+stored audio instead of calling Text-to-Speech again. Old segments are
+meant to be removed by a bucket lifecycle rule on the prefix.
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import threading
+from typing import Any, Optional
+
+# Logger Setup
+logger = logging.getLogger("podcast_generator")
+logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "DEBUG").upper(), logging.DEBUG))
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+
+class TTSCache:
+    """Reads and writes TTS segments in a GCS bucket under a key prefix."""
+
+    def __init__(self, bucket: Any, prefix: str) -> None:
+        self.bucket = bucket
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def key_for(text: str, voice: str, language: str, sample_rate: int, encoding: str) -> str:
+        """Hash of the passage text and all audio-relevant parameters."""
+        digest = hashlib.sha256()
+        for part in (text, voice, language, str(sample_rate), encoding):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _blob(self, key: str) -> Any:
+        return self.bucket.blob(f"{self.prefix}{key}.mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio or None (cache errors are treated as misses)."""
+        from google.api_core import exceptions as gcs_exceptions
+        try:
+            audio: bytes = self._blob(key).download_as_bytes()
+        except gcs_exceptions.NotFound:
+            audio = b""
+        except Exception as e:
+            logger.warning(f"TTS cache read failed ({key[:12]}): {e}")
+            audio = b""
+        with self._lock:
+            if audio:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return audio or None
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store a segment; failures are logged and ignored."""
+        try:
+            self._blob(key).upload_from_string(audio, content_type="audio/mpeg")
+        except Exception as e:
+            logger.warning(f"TTS cache write failed ({key[:12]}): {e}")
@@ -0,0 +1,181 @@
+"""
+Concurrent TTS synthesis with ordered reassembly.
+
+`TTSEngine` runs a synthesize callable for many passages on a bounded
+thread pool, paces request starts to stay inside the TTS quota, retries
+quota and transient errors (timeouts, unavailable, 5xx) with exponential
+backoff and yields the audio segments in script order. Other errors (e.g.
+invalid text or auth failures) fail the passage immediately. Passages may come from any iterable (e.g. a generator), and
+at most `max_in_flight` segments are held at a time. An optional `lookup`
+callable (e.g. a segment cache) is tried first and does not count against
+the quota.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+import requests
+
+from config import PodcastConfig
+
+# Logger Setup
+logger = logging.getLogger("podcast_generator")
+logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "DEBUG").upper(), logging.DEBUG))
+
+if not logger.handlers:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+
+
+# API status names that are worth retrying besides quota errors
+TRANSIENT_STATUSES = ("DEADLINE_EXCEEDED", "UNAVAILABLE")
+
+
+class TTSSynthesisError(RuntimeError):
+    """A passage could not be synthesized after all retries."""
+
+
+class RequestPacer:
+    """Thread-safe pacing of request starts to a requests-per-minute quota."""
+
+    def __init__(self, requests_per_minute: int, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.interval: float = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_start: float = 0.0
+
+    def wait(self) -> None:
+        """Block until the next request may start."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            self._sleep(start - now)
+
+    def backoff(self, seconds: float) -> None:
+        """Delay all further request starts (e.g. after a quota error)."""
+        with self._lock:
+            self._next_start = max(self._next_start, self._clock() + seconds)
+
+
+class TTSEngine:
+    """Bounded-parallel TTS with quota pacing, retries and ordered output."""
+
+    def __init__(
+        self,
+        synthesize: Callable[[int, str], bytes],
+        lookup: Optional[Callable[[int, str], Optional[bytes]]] = None,
+        max_workers: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_seconds: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.synthesize = synthesize
+        self.lookup = lookup
+        self.max_workers: int = max(1, max_workers or PodcastConfig.TTS_MAX_WORKERS)
+        self.max_in_flight: int = self.max_workers * 2
+        self.max_retries: int = PodcastConfig.TTS_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self._sleep = sleep
+        self.pacer = RequestPacer(
+            requests_per_minute if requests_per_minute is not None else PodcastConfig.TTS_REQUESTS_PER_MINUTE,
+            sleep=sleep,
+        )
+        self.retries: int = 0
+        self.passages: int = 0
+
+    @staticmethod
+    def _causes(exc: Optional[BaseException]) -> Iterator[BaseException]:
+        """The exception and its `__cause__` chain (wrapped client errors)."""
+        seen = set()
+        while exc is not None and id(exc) not in seen:
+            seen.add(id(exc))
+            yield exc
+            exc = exc.__cause__
+
+    @staticmethod
+    def _status(exc: BaseException) -> Tuple[Optional[int], Optional[str]]:
+        """HTTP status code and gRPC/API status name of a client error, if any."""
+        code = getattr(exc, "code", None)
+        response = getattr(exc, "response", None)
+        if not isinstance(code, int):
+            code = getattr(response, "status_code", None)
+        grpc_code = getattr(exc, "grpc_status_code", None)
+        status = getattr(grpc_code, "name", None) or getattr(exc, "status", None)
+        return (code if isinstance(code, int) else None), (status if isinstance(status, str) else None)
+
+    @classmethod
+    def _is_quota_error(cls, exc: Optional[BaseException]) -> bool:
+        """Quota errors by status only: HTTP 429 or RESOURCE_EXHAUSTED (also on wrapped causes)."""
+        for error in cls._causes(exc):
+            code, status = cls._status(error)
+            if code == 429 or status == "RESOURCE_EXHAUSTED":
+                return True
+        return False
+
+    @classmethod
+    def _is_transient_error(cls, exc: Optional[BaseException]) -> bool:
+        """Timeouts, connection errors, DEADLINE_EXCEEDED/UNAVAILABLE and HTTP 5xx."""
+        for error in cls._causes(exc):
+            if isinstance(error, (TimeoutError, ConnectionError, requests.ConnectionError, requests.Timeout)):
+                return True
+            code, status = cls._status(error)
+            if (code is not None and code >= 500) or status in TRANSIENT_STATUSES:
+                return True
+        return False
+
+    def _synthesize_with_retry(self, index: int, text: str) -> bytes:
+        if self.lookup is not None:
+            cached: Optional[bytes] = self.lookup(index, text)
+            if cached:
+                return cached
+        for attempt in range(self.max_retries + 1):
+            self.pacer.wait()
+            try:
+                return self.synthesize(index, text)
+            except Exception as e:
+                quota: bool = self._is_quota_error(e)
+                if not quota and not self._is_transient_error(e):
+                    # Invalid text/SSML, auth errors etc. fail the same way on every retry
+                    raise TTSSynthesisError(f"TTS failed for passage {index + 1} (not retryable): {e}") from e
+                if attempt == self.max_retries:
+                    raise TTSSynthesisError(f"TTS failed for passage {index + 1} after {attempt + 1} attempts: {e}") from e
+                delay = self.retry_base_seconds * (2 ** attempt)
+                self.retries += 1
+                logger.warning(f"TTS passage {index + 1} failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s.")
+                if quota:
+                    # Quota errors pause all workers, not just this one
+                    self.pacer.backoff(delay)
+                else:
+                    self._sleep(delay)
+        raise TTSSynthesisError(f"TTS failed for passage {index + 1}.")
+
+    def run(self, passages: Iterable[str]) -> Iterator[bytes]:
+        """Synthesize passages concurrently and yield audio in passage order."""
+        pending: Deque[Future] = deque()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
+        try:
+            for index, text in enumerate(passages):
+                self.passages = index + 1
+                pending.append(executor.submit(self._synthesize_with_retry, index, text))
+                while len(pending) >= self.max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,35 +1,150 @@
-import os
+import json
 import logging
 import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
 from urllib.parse import urlparse, parse_qs, unquote
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.rate_limiters import InMemoryRateLimiter
-from google import genai
-from google.genai import types
+from config import SendmailConfig
+from batch_planner import BatchPlanner, TruncatedResponseError
+from content_fetcher import fetch_page_contents
+from llm_cache import LLMCache, prompt_version
+from rate_limiter import TokenBucketLimiter, estimate_tokens, quota_retry_delay
 
 logger = logging.getLogger(__name__)
 
+YOUTUBE_CATEGORIES = [
+    "Technology and Gadgets", "Artificial Intelligence", "Programming and Development",
+    "Politics", "Business and Finance", "Sports", "Education and Learning",
+    "Health and Wellness", "Entertainment and Lifestyle", "Travel and Tourism"
+]
+
+YOUTUBE_SUMMARY_PROMPT = f"""
+Du bist ein Assistent, der YouTube-Videos zusammenfasst und kategorisiert.
+Anweisungen:
+1. Fasse das Video in 2-3 Sätzen zusammen.
+2. Schätze die Betrachtungszeit in Minuten.
+3. Ordne das Video einer der folgenden Kategorien zu:
+   {', '.join(YOUTUBE_CATEGORIES)}
+   Wenn keine Kategorie passt, gib 'Uncategorized' zurück.
+"""
+
+YOUTUBE_ALERT_PROMPT = """
+Du bist ein Assistent, der YouTube-Videos aus Google Alerts zusammenfasst.
+Anweisungen:
+1. Fasse das Video in 2-3 Sätzen zusammen.
+2. Schätze die Betrachtungszeit in Minuten.
+
+Format:
+Summary: <Zusammenfassung>
+Reading Time: <geschätzte Minuten>
+"""
+
+# Platzhalter-Antworten, die nicht gecacht werden
+UNREACHABLE_SUMMARY = "Website content could not be reached!"
+
+# System-Prompt für die Website-Zusammenfassung (EXAKT wie in llm_calls.py)
+WEBSITE_SUMMARY_PROMPT = """
+                You are an assistant that processes multiple URLs provided by the user.
+                For each input, perform the following tasks:
+
+                1. Summarize the content of the Website in about 3 sentences.
+                2. Categorize it into one of the following categories:
+                   - Technology and Gadgets
+                   - Artificial Intelligence
+                   - Programming and Development
+                   - Politics
+                   - Business and Finance
+                   - Sports
+                   - Education and Learning
+                   - Health and Wellness
+                   - Entertainment and Lifestyle
+                   - Travel and Tourism
+                   If a website does not fit into one of these categories, return 'Uncategorized'.
+                3. Identify specific topics or entities mentioned in the articles. These should be precise and clearly defined, such as names of technologies, events, organizations, or specific concepts discussed in the text.
+                4. Estimate the reading time of the article in minutes based on the length and complexity of the content. Make sure you assess each article individually!
+                
+                SPECIAL RULE FOR GITHUB URLs:
+                - If the URL is a GitHub **repository** page, set Category **exactly** to "GitHub" (override the list above).
+                - If content is a **GitHub Blog** Post, treat it like any other website, do not categorize it as "GitHub". Check the content of the page to determine if it is a blog post.
+                DO NOT use the "GitHub" category; choose from the normal list above if the post is a blog post. Only repositories should be categorized as "GitHub".
+                
+                If you are unable to access the contents of the provided website, return "Website content could not be reached!" for that input.
+
+                Format your response as follows:
+                Input 1 (URL: <url>):
+                Summary: <summary>
+                Category: <category> # "GitHub" only for repository URLs as defined above
+                Topics: <topic1>, <topic2>, ...
+                Reading Time: <X> minutes
+
+                Input 2 (URL: <url>):
+                Summary: <summary>
+                Category: <category>
+                Topics: <topic1>, <topic2>, ...
+                Reading Time: <X> minutes
+
+                ...
+
+                Ensure that the topics are specific and relevant to the main content of the article.
+                """
+
+# Structured-Output-Variante: gleiche Aufgaben, Antwort als JSON-Array
+WEBSITE_SUMMARY_JSON_PROMPT = WEBSITE_SUMMARY_PROMPT.split("Format your response as follows:")[0] + """If an input includes "Page content", base your answer on that text instead of fetching the URL.
+
+                Return a JSON array with exactly one object per input, in input order.
+                Each object must contain:
+                - "index": the input number (1 for "Input 1", 2 for "Input 2", ...)
+                - "summary": the summary (or "Website content could not be reached!")
+                - "category": the category
+                - "topics": a list of specific topics
+                - "reading_time": the estimated reading time in minutes as an integer
+
+                Ensure that the topics are specific and relevant to the main content of the article.
+                """
+
+WEBSITE_SUMMARY_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "index": {"type": "INTEGER"},
+            "summary": {"type": "STRING"},
+            "category": {"type": "STRING"},
+            "topics": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "reading_time": {"type": "INTEGER"},
+        },
+        "required": ["index", "summary", "category", "topics", "reading_time"],
+    },
+}
+
 
 class AIService:
     def __init__(self, gemini_api_key: str):
         self.gemini_api_key = gemini_api_key
         self.genai_client = None
         self.llm = None
-        self.website_batch_size = int(os.getenv("WEBSITE_SUMMARY_BATCH_SIZE", "20"))
+        # Obergrenze URLs pro Batch; gepackt wird nach Token-Budget
+        self.website_batch_size = SendmailConfig.WEBSITE_SUMMARY_BATCH_SIZE
+        # Gemeinsamer Limiter für alle Gemini-Aufrufe dieses Service
+        self.rate_limiter = TokenBucketLimiter(
+            requests_per_minute=SendmailConfig.GEMINI_RPM,
+            tokens_per_minute=SendmailConfig.GEMINI_TPM,
+        )
+        self.structured_output = SendmailConfig.WEBSITE_STRUCTURED_OUTPUT
+        website_prompt = WEBSITE_SUMMARY_JSON_PROMPT if self.structured_output else WEBSITE_SUMMARY_PROMPT
+        self.website_cache = LLMCache(SendmailConfig.GEMINI_MODEL, prompt_version("website", website_prompt))
+        self.youtube_cache = LLMCache(SendmailConfig.GEMINI_MODEL, prompt_version("youtube", YOUTUBE_SUMMARY_PROMPT))
 
     def _init_llm(self):
-        rate_limiter = InMemoryRateLimiter(requests_per_second=0.2, check_every_n_seconds=0.1, max_bucket_size=1)
+        from langchain_google_genai import ChatGoogleGenerativeAI
         return ChatGoogleGenerativeAI(
-            model="gemini-3.1-flash-lite-preview",
+            model=SendmailConfig.GEMINI_MODEL,
             google_api_key=self.gemini_api_key,
             temperature=0,
             max_tokens=None,
             timeout=None,
             max_retries=2,
-            rate_limiter=rate_limiter,
         )
 
     def _ensure_ai_clients(self):
@@ -37,6 +152,8 @@ class AIService:
             return
         if not self.gemini_api_key:
             raise RuntimeError("Kein gültiger Gemini API-Key gefunden. Bitte setze GEMINI_API_KEY als Secret ohne Zeilenumbrüche.")
+        # SDKs erst beim ersten LLM-Aufruf importieren, nicht beim Kaltstart
+        from google import genai
         self.genai_client = genai.Client(api_key=self.gemini_api_key)
         self.llm = self._init_llm()
 
@@ -48,23 +165,69 @@ class AIService:
         if not links_list:
             return {}
 
-        batch_size = max(1, self.website_batch_size)
+        cached_results = self.website_cache.get_many(links_list)
+        links_list = [url for url in links_list if url not in cached_results]
+        if not links_list:
+            logger.info("Alle %s URLs aus dem LLM-Cache bedient.", len(cached_results))
+            self._assign_sub_categories(cached_results)
+            return cached_results
+
+        page_contents = fetch_page_contents(links_list) if SendmailConfig.WEBSITE_PREFETCH else {}
+
         all_results = {}
-        total_batches = (len(links_list) + batch_size - 1) // batch_size
+        pending_urls = links_list
+        max_passes = 1 + (SendmailConfig.WEBSITE_SUMMARY_RETRIES if self.structured_output else 0)
+        for pass_index in range(1, max_passes + 1):
+            if pass_index > 1:
+                logger.info("Wiederhole %s URLs ohne Ergebnis (Durchlauf %s/%s).", len(pending_urls), pass_index, max_passes)
+            all_results.update(self._summarise_website_batches(pending_urls, page_contents))
+            pending_urls = [url for url in pending_urls if url not in all_results]
+            if not pending_urls:
+                break
 
-        for batch_index, start in enumerate(range(0, len(links_list), batch_size), start=1):
-            batch_urls = links_list[start:start + batch_size]
+        logger.info("Batch-Verarbeitung abgeschlossen: %s/%s URLs mit Ergebnis.", len(all_results), len(links_list))
+        # sub_category hängt von den übrigen URLs des Laufs ab und wird daher
+        # nicht gecacht, sondern pro Lauf aus den Themen neu berechnet.
+        self.website_cache.put_many({
+            url: {key: value for key, value in meta.items() if key != "sub_category"}
+            for url, meta in all_results.items()
+            if self._is_cacheable(meta)
+        })
+        all_results.update(cached_results)
+        self._assign_sub_categories(all_results)
+        return all_results
+
+    def _summarise_website_batches(self, links_list, page_contents):
+        """Verarbeitet ``links_list`` in parallelen Batches (ein Durchlauf)."""
+        planner = self._website_planner(page_contents)
+        batches = planner.plan(links_list)
+        total_batches = len(batches)
+        BatchPlanner.log_utilisation(batches, "Website")
+
+        def run_batch(batch_index, batch):
             logger.info(
                 "Verarbeite Website-Batch %s/%s (%s URLs)",
                 batch_index,
                 total_batches,
-                len(batch_urls),
+                len(batch.items),
             )
-            prompt = self._build_prompt(batch_urls)
-            batch_results = self._process_llm_response(prompt)
-            all_results.update(batch_results)
+            tokens = batch.input_tokens + batch.output_tokens
+            if self.structured_output:
+                return self._call_with_quota(self._process_structured_response, batch.items, page_contents, tokens=tokens)
+            prompt = self._build_prompt(batch.items, page_contents)
+            return self._call_with_quota(self._process_llm_response, prompt, tokens=tokens)
+
+        batch_results_list = self._run_concurrently(
+            [(batch_index, batch) for batch_index, batch in enumerate(batches, start=1)],
+            lambda batch_index, batch: self._run_with_split(planner, batch, lambda part: run_batch(batch_index, part)),
+        )
+
+        # Ergebnisse in Batch-Reihenfolge zusammenführen (deterministisch)
+        results = {}
+        for batch_index, (batch, batch_results) in enumerate(zip(batches, batch_results_list), start=1):
+            results.update(batch_results)
 
-            missing_urls = [url for url in batch_urls if url not in batch_results]
+            missing_urls = [url for url in batch.items if url not in batch_results]
             if missing_urls:
                 logger.warning(
                     "Batch %s/%s: %s URLs ohne parsebares Ergebnis.",
@@ -72,63 +235,179 @@ class AIService:
                     total_batches,
                     len(missing_urls),
                 )
+        return results
 
-        logger.info("Batch-Verarbeitung abgeschlossen: %s/%s URLs mit Ergebnis.", len(all_results), len(links_list))
-        return all_results
+    @staticmethod
+    def _run_with_split(planner, batch, run):
+        """Führt ``run(batch)`` aus und halbiert den Batch bei abgeschnittener Antwort."""
+        try:
+            return run(batch)
+        except TruncatedResponseError as e:
+            parts = planner.split(batch)
+            if len(parts) < 2:
+                logger.error(f"Antwort für Einzel-Item abgeschnitten, verwerfe Ergebnis: {e}")
+                return {}
+            logger.warning(f"Antwort abgeschnitten ({len(batch.items)} Items) – teile in {len(parts)} Batches.")
+            results = {}
+            for part in parts:
+                results.update(AIService._run_with_split(planner, part, run))
+            return results
+
+    def _process_structured_response(self, batch_urls, page_contents=None):
+        """Ruft Gemini im JSON-Modus auf und ordnet Ergebnisse per Index zu."""
+        from google.genai import types
+        logger.info("Rufe Gemini (JSON-Modus) zur Zusammenfassung und Kategorisierung auf...")
+        combined_input = self._format_website_inputs(batch_urls, page_contents)
+        response = self.genai_client.models.generate_content(
+            model=SendmailConfig.GEMINI_MODEL,
+            contents=combined_input,
+            config=types.GenerateContentConfig(
+                system_instruction=WEBSITE_SUMMARY_JSON_PROMPT,
+                temperature=0,
+                max_output_tokens=SendmailConfig.GEMINI_MAX_OUTPUT_TOKENS,
+                response_mime_type="application/json",
+                response_schema=WEBSITE_SUMMARY_SCHEMA,
+            ),
+        )
+        logger.debug(f"LLM raw JSON response:\n{response.text}")
+        candidate = (response.candidates or [None])[0]
+        if candidate is not None and candidate.finish_reason == types.FinishReason.MAX_TOKENS:
+            raise TruncatedResponseError(f"JSON-Antwort für {len(batch_urls)} URLs am Output-Limit abgeschnitten.")
+        try:
+            items = json.loads(response.text or "[]")
+        except json.JSONDecodeError as e:
+            logger.error(f"Gemini lieferte ungültiges JSON: {e}")
+            return {}
+        if not isinstance(items, list):
+            logger.error("Gemini lieferte kein JSON-Array.")
+            return {}
+
+        results = {}
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            if not isinstance(index, int) or not 1 <= index <= len(batch_urls):
+                # Fallback: Position im Array, falls der Index fehlt/ungültig ist
+                index = position + 1
+                if index > len(batch_urls):
+                    continue
+            url = batch_urls[index - 1]
+            if url in results:
+                logger.warning(f"Doppeltes Ergebnis für Input {index} ignoriert.")
+                continue
+            summary = (item.get("summary") or "").strip() or None
+            if summary is None:
+                continue
+            reading_time = item.get("reading_time")
+            results[url] = {
+                "summary": summary,
+                "category": (item.get("category") or "").strip() or None,
+                "topics": [str(topic).strip() for topic in item.get("topics") or [] if str(topic).strip()],
+                "reading_time": reading_time if isinstance(reading_time, int) else None,
+                "sub_category": None,
+            }
+            logger.debug(f"Eintrag für URL {url} mit Kategorie '{results[url]['category']}' verarbeitet.")
+
+        return results
+
+    @staticmethod
+    def _assign_sub_categories(results):
+        """Subkategorisierung basierend auf Themen (ab 3 URLs pro Thema im Lauf)."""
+        topic_counts = defaultdict(list)
+        for url, meta in results.items():
+            meta["sub_category"] = None
+            for topic in meta.get("topics") or []:
+                topic_counts[topic].append(url)
 
-    def _build_prompt(self, links_list):
+        for topic, urls in topic_counts.items():
+            if len(urls) >= 3:
+                logger.info(f"Subkategorie '{topic}' für {len(urls)} URLs zugewiesen.")
+                for url in urls:
+                    if results[url]["sub_category"] is None:
+                        results[url]["sub_category"] = topic
+
+    @staticmethod
+    def _is_cacheable(meta):
+        """Nur verwertbare Ergebnisse cachen (keine Platzhalter/Fehler)."""
+        summary = meta.get("summary")
+        return bool(summary) and UNREACHABLE_SUMMARY.lower() not in str(summary).lower()
+
+    @staticmethod
+    def _format_website_inputs(batch_urls, page_contents=None):
+        """Baut den Human-Input; vorab geladene Seiteninhalte werden angehängt."""
+        page_contents = page_contents or {}
+        inputs = []
+        for i, url in enumerate(batch_urls):
+            text = f"Input {i+1} (URL: {url})"
+            if page_contents.get(url):
+                text += f"\nPage content:\n{page_contents[url]}"
+            inputs.append(text)
+        return "\n\n".join(inputs)
+
+    @staticmethod
+    def _estimate_item_tokens(url, content=None):
+        """Geschätzte Input-Tokens eines einzelnen Website-Inputs."""
+        return estimate_tokens(url) + 10 + estimate_tokens(content)
+
+    def _website_planner(self, page_contents):
+        """Planner für Website-Batches nach Input-/Output-Token-Budget."""
+        system_prompt = WEBSITE_SUMMARY_JSON_PROMPT if self.structured_output else WEBSITE_SUMMARY_PROMPT
+        return BatchPlanner(
+            max_input_tokens=SendmailConfig.WEBSITE_BATCH_INPUT_TOKENS,
+            max_output_tokens=SendmailConfig.WEBSITE_BATCH_OUTPUT_TOKENS,
+            base_input_tokens=estimate_tokens(system_prompt),
+            input_tokens=lambda url: self._estimate_item_tokens(url, page_contents.get(url)),
+            output_tokens=lambda url: SendmailConfig.GEMINI_OUTPUT_TOKENS_PER_URL,
+            max_items=max(1, self.website_batch_size),
+        )
+
+    def _call_with_quota(self, fn, *args, tokens=0, **kwargs):
+        """Ruft ``fn`` über den gemeinsamen Limiter auf.
+
+        Quota-Antworten von Gemini pausieren den Limiter für die angegebene
+        Wartezeit; danach wird bis zu ``GEMINI_QUOTA_RETRIES`` Mal erneut
+        versucht. Andere Fehler werden direkt weitergereicht.
+        """
+        for attempt in range(SendmailConfig.GEMINI_QUOTA_RETRIES + 1):
+            self.rate_limiter.acquire(tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = quota_retry_delay(e)
+                if delay is None or attempt == SendmailConfig.GEMINI_QUOTA_RETRIES:
+                    raise
+                logger.warning(
+                    "Gemini-Quota-Antwort (Versuch %s/%s): %s",
+                    attempt + 1,
+                    SendmailConfig.GEMINI_QUOTA_RETRIES,
+                    e,
+                )
+                self.rate_limiter.pause(delay)
+
+    @staticmethod
+    def _run_concurrently(jobs, worker):
+        """Führt ``worker(*job)`` parallel aus und liefert Ergebnisse in Job-Reihenfolge."""
+        if not jobs:
+            return []
+        max_workers = max(1, min(SendmailConfig.GEMINI_MAX_CONCURRENCY, len(jobs)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(worker, *job) for job in jobs]
+            return [future.result() for future in futures]
+
+    def _build_prompt(self, links_list, page_contents=None):
         """Erstellt den Prompt für Gemini (EXAKT wie in llm_calls.py)."""
+        from langchain_core.prompts import ChatPromptTemplate
         logger.debug("Erstelle Prompt für Gemini-Anfrage...")
-        combined_input = "\n\n".join(f"Input {i+1} (URL: {url})" for i, url in enumerate(links_list))
+        combined_input = self._format_website_inputs(links_list, page_contents)
+        # Geschweifte Klammern aus Seiteninhalten nicht als Template-Variablen werten
+        combined_input = combined_input.replace("{", "{{").replace("}", "}}")
 
         prompt = ChatPromptTemplate.from_messages(
             [
                 (
                     "system",
-                    """
-                You are an assistant that processes multiple URLs provided by the user.
-                For each input, perform the following tasks:
-
-                1. Summarize the content of the Website in about 3 sentences.
-                2. Categorize it into one of the following categories:
-                   - Technology and Gadgets
-                   - Artificial Intelligence
-                   - Programming and Development
-                   - Politics
-                   - Business and Finance
-                   - Sports
-                   - Education and Learning
-                   - Health and Wellness
-                   - Entertainment and Lifestyle
-                   - Travel and Tourism
-                   If a website does not fit into one of these categories, return 'Uncategorized'.
-                3. Identify specific topics or entities mentioned in the articles. These should be precise and clearly defined, such as names of technologies, events, organizations, or specific concepts discussed in the text.
-                4. Estimate the reading time of the article in minutes based on the length and complexity of the content. Make sure you assess each article individually!
-                
-                SPECIAL RULE FOR GITHUB URLs:
-                - If the URL is a GitHub **repository** page, set Category **exactly** to "GitHub" (override the list above).
-                - If content is a **GitHub Blog** Post, treat it like any other website, do not categorize it as "GitHub". Check the content of the page to determine if it is a blog post.
-                DO NOT use the "GitHub" category; choose from the normal list above if the post is a blog post. Only repositories should be categorized as "GitHub".
-                
-                If you are unable to access the contents of the provided website, return "Website content could not be reached!" for that input.
-
-                Format your response as follows:
-                Input 1 (URL: <url>):
-                Summary: <summary>
-                Category: <category> # "GitHub" only for repository URLs as defined above
-                Topics: <topic1>, <topic2>, ...
-                Reading Time: <X> minutes
-
-                Input 2 (URL: <url>):
-                Summary: <summary>
-                Category: <category>
-                Topics: <topic1>, <topic2>, ...
-                Reading Time: <X> minutes
-
-                ...
-
-                Ensure that the topics are specific and relevant to the main content of the article.
-                """,
+                    WEBSITE_SUMMARY_PROMPT,
                 ),
                 ("human", f"{combined_input}"),
             ]
@@ -141,11 +420,12 @@ class AIService:
         """Verarbeitet LLM-Ausgabe und extrahiert strukturierte Daten (EXAKT wie in llm_calls.py)."""
         logger.info("Rufe Gemini LLM zur Zusammenfassung und Kategorisierung auf...")
         chain = prompt | self.llm
-        response = chain.invoke({}).content
+        message = chain.invoke({})
+        self._raise_if_truncated(message)
+        response = message.content
         logger.debug(f"LLM raw response:\n{response}")
 
         results = {}
-        topic_counts = defaultdict(list)
 
         for entry in response.split("\n\n"):
             if "Input" in entry:
@@ -174,32 +454,44 @@ class AIService:
                 }
                 logger.debug(f"Eintrag für URL {url} mit Kategorie '{category}' verarbeitet.")
 
-                for topic in topics:
-                    topic_counts[topic].append(url)
-
-        # Subkategorisierung basierend auf Themen
-        for topic, urls in topic_counts.items():
-            if len(urls) >= 3:
-                logger.info(f"Subkategorie '{topic}' für {len(urls)} URLs zugewiesen.")
-                for url in urls:
-                    if results[url]["sub_category"] is None:
-                        results[url]["sub_category"] = topic
-
         return results
 
     def summarise_alerts(self, alerts_dict):
-        """Erstellt Zusammenfassungen für Google Alerts (EXAKT wie in llm_calls.py)."""
+        """Erstellt Zusammenfassungen für Google Alerts (EXAKT wie in llm_calls.py).
+
+        Die URLs eines Labels werden per `BatchPlanner` auf Requests verteilt,
+        statt unabhängig von ihrer Anzahl in einen einzigen Prompt zu gehen.
+        """
         logger.info(f"Starte Zusammenfassung für {len(alerts_dict)} Google Alerts.")
         self._ensure_ai_clients()
         all_results = {}
         for label, urls in alerts_dict.items():
             logger.debug(f"Verarbeite Alert '{label}' mit {len(urls)} URLs.")
-            combined_input = "\n".join(f"{url}" for url in urls)
-            prompt = ChatPromptTemplate.from_messages(
-                [
-                    (
-                        "system",
-                        f"""
+            planner = BatchPlanner(
+                max_input_tokens=SendmailConfig.WEBSITE_BATCH_INPUT_TOKENS,
+                max_output_tokens=SendmailConfig.WEBSITE_BATCH_OUTPUT_TOKENS,
+                base_input_tokens=estimate_tokens(self._alert_system_prompt(label)),
+                input_tokens=lambda url: estimate_tokens(url) + 1,
+                output_tokens=lambda url: SendmailConfig.GEMINI_OUTPUT_TOKENS_PER_URL,
+            )
+            batches = planner.plan(list(urls))
+            BatchPlanner.log_utilisation(batches, f"Alert '{label}'")
+
+            def run_batch(batch, label=label):
+                return self._call_with_quota(
+                    self._process_alert_response,
+                    self._build_alert_prompt(label, batch.items),
+                    batch.items,
+                    tokens=batch.input_tokens + batch.output_tokens,
+                )
+
+            for batch in batches:
+                all_results.update(self._run_with_split(planner, batch, run_batch))
+        return all_results
+
+    @staticmethod
+    def _alert_system_prompt(label):
+        return f"""
             You are an assistant that summarizes multiple URLs for the alert '{label}'.
             For each URL, provide:
             1. Summary (2-3 sentences)
@@ -212,20 +504,32 @@ class AIService:
             <URL>:
             Summary: <summary>
             Reading Time: <X> minutes
-            """,
-                    ),
-                    ("human", combined_input),
-                ]
-            )
-            result = self._process_alert_response(prompt, urls)
-            all_results.update(result)
-        return all_results
+            """
+
+    def _build_alert_prompt(self, label, urls):
+        from langchain_core.prompts import ChatPromptTemplate
+        combined_input = "\n".join(f"{url}" for url in urls)
+        return ChatPromptTemplate.from_messages(
+            [
+                ("system", self._alert_system_prompt(label)),
+                ("human", combined_input),
+            ]
+        )
+
+    @staticmethod
+    def _raise_if_truncated(message):
+        """Wirft `TruncatedResponseError`, wenn LangChain MAX_TOKENS meldet."""
+        finish_reason = (getattr(message, "response_metadata", None) or {}).get("finish_reason")
+        if str(finish_reason).upper().endswith("MAX_TOKENS"):
+            raise TruncatedResponseError("LLM-Antwort am Output-Limit abgeschnitten.")
 
     def _process_alert_response(self, prompt, urls):
         """Verarbeitet Gemini Antwort für Google Alerts (EXAKT wie in llm_calls.py)."""
         logger.info("Rufe Gemini LLM für Google Alerts Zusammenfassung auf...")
         chain = prompt | self.llm
-        response = chain.invoke({}).content
+        message = chain.invoke({})
+        self._raise_if_truncated(message)
+        response = message.content
         logger.debug(f"LLM alert raw response:\n{response}")
 
         results = {}
@@ -247,75 +551,98 @@ class AIService:
         return results
 
     def summarise_youtube_videos(self, youtube_urls):
-        """Fasst YouTube-Videos zusammen und kategorisiert sie."""
+        """Fasst YouTube-Videos parallel zusammen und kategorisiert sie."""
         self._ensure_ai_clients()
-        results = {}
-        categories = [
-            "Technology and Gadgets", "Artificial Intelligence", "Programming and Development",
-            "Politics", "Business and Finance", "Sports", "Education and Learning",
-            "Health and Wellness", "Entertainment and Lifestyle", "Travel and Tourism"
-        ]
-        for url in youtube_urls:
-            url = url.rstrip(":")
-            try:
-                clean_url = self._clean_youtube_url(url)
-                youtube_video = types.Part.from_uri(file_uri=clean_url, mime_type="video/*")
-                prompt_text = f"""
-Du bist ein Assistent, der YouTube-Videos zusammenfasst und kategorisiert.
-Anweisungen:
-1. Fasse das Video in 2-3 Sätzen zusammen.
-2. Schätze die Betrachtungszeit in Minuten.
-3. Ordne das Video einer der folgenden Kategorien zu:
-   {', '.join(categories)}
-   Wenn keine Kategorie passt, gib 'Uncategorized' zurück.
-"""
-                contents = [youtube_video, types.Part.from_text(text=prompt_text)]
-                generate_config = types.GenerateContentConfig(temperature=0, max_output_tokens=1024, response_modalities=["TEXT"])
-                response = self.genai_client.models.generate_content(model="gemini-3.1-flash-lite-preview", contents=contents, config=generate_config)
-                text = response.text.strip()
-                summary_match = re.search(r"Summary:\s*(.+)", text, re.IGNORECASE)
-                reading_time_match = re.search(r"Reading\s*Time:\s*(\d+)", text, re.IGNORECASE)
-                category_match = re.search(r"Category:\s*(.+)", text, re.IGNORECASE)
-                results[url] = {
-                    "summary": summary_match.group(1).strip() if summary_match else None,
-                    "reading_time": int(reading_time_match.group(1)) if reading_time_match else None,
-                    "category": category_match.group(1).strip() if category_match else "Uncategorized",
-                }
-            except Exception as e:
-                logger.error(f"Fehler bei Verarbeitung des Videos {url}: {e}")
-                results[url] = {"summary": None, "reading_time": None, "category": None}
+        youtube_urls = [url.rstrip(":") for url in youtube_urls]
+        cached_results = self.youtube_cache.get_many(youtube_urls)
+
+        def parse(text):
+            summary_match = re.search(r"Summary:\s*(.+)", text, re.IGNORECASE)
+            reading_time_match = re.search(r"Reading\s*Time:\s*(\d+)", text, re.IGNORECASE)
+            category_match = re.search(r"Category:\s*(.+)", text, re.IGNORECASE)
+            return {
+                "summary": summary_match.group(1).strip() if summary_match else None,
+                "reading_time": int(reading_time_match.group(1)) if reading_time_match else None,
+                "category": category_match.group(1).strip() if category_match else "Uncategorized",
+            }
+
+        results = self._summarise_videos(
+            [url for url in youtube_urls if url not in cached_results],
+            YOUTUBE_SUMMARY_PROMPT,
+            parse,
+            failure_result={"summary": None, "reading_time": None, "category": None},
+        )
+        self.youtube_cache.put_many({url: meta for url, meta in results.items() if self._is_cacheable(meta)})
+        results.update(cached_results)
         return results
 
     def summarise_youtube_alerts(self, youtube_urls):
-        """Fasst YouTube-Videos aus Google Alerts zusammen."""
+        """Fasst YouTube-Videos aus Google Alerts parallel zusammen."""
         self._ensure_ai_clients()
+
+        def parse(text):
+            summary_match = re.search(r"Summary:\s*(.+)", text, re.IGNORECASE)
+            reading_time_match = re.search(r"Reading\s*Time:\s*(\d+)", text, re.IGNORECASE)
+            return {"summary": summary_match.group(1).strip() if summary_match else None, "reading_time": int(reading_time_match.group(1)) if reading_time_match else None}
+
+        return self._summarise_videos(
+            [url.rstrip(":") for url in youtube_urls],
+            YOUTUBE_ALERT_PROMPT,
+            parse,
+            failure_result={"summary": None, "reading_time": None},
+        )
+
+    def _summarise_videos(self, urls, prompt_text, parse, failure_result):
+        """Führt Video-Zusammenfassungen parallel mit Deadline aus.
+
+        Jeder Aufruf läuft über den gemeinsamen Limiter und hat ein eigenes
+        HTTP-Timeout (``YOUTUBE_CALL_TIMEOUT_SECONDS``). Was nach
+        ``YOUTUBE_TOTAL_TIMEOUT_SECONDS`` nicht fertig ist, wird abgebrochen
+        und mit ``failure_result`` belegt. Ergebnisse in Input-Reihenfolge.
+        """
+        if not urls:
+            return {}
+        from google.genai import types
+        generate_config = types.GenerateContentConfig(
+            temperature=0,
+            max_output_tokens=1024,
+            response_modalities=["TEXT"],
+            http_options=types.HttpOptions(timeout=SendmailConfig.YOUTUBE_CALL_TIMEOUT_SECONDS * 1000),
+        )
+
+        def run_video(url):
+            clean_url = self._clean_youtube_url(url)
+            youtube_video = types.Part.from_uri(file_uri=clean_url, mime_type="video/*")
+            contents = [youtube_video, types.Part.from_text(text=prompt_text)]
+            response = self._call_with_quota(
+                self.genai_client.models.generate_content,
+                model=SendmailConfig.GEMINI_MODEL,
+                contents=contents,
+                config=generate_config,
+                tokens=SendmailConfig.YOUTUBE_ESTIMATED_TOKENS,
+            )
+            return parse(response.text.strip())
+
+        max_workers = max(1, min(SendmailConfig.YOUTUBE_MAX_CONCURRENCY, len(urls)))
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {url: executor.submit(run_video, url) for url in urls}
+        _, not_done = wait(futures.values(), timeout=SendmailConfig.YOUTUBE_TOTAL_TIMEOUT_SECONDS)
+        # Laufende Threads enden spätestens mit ihrem HTTP-Timeout; wartende Jobs werden verworfen.
+        executor.shutdown(wait=False, cancel_futures=True)
+
         results = {}
-        for url in youtube_urls:
-            url = url.rstrip(":")
+        for url, future in futures.items():
+            if future in not_done:
+                future.cancel()
+                logger.error(f"Zeitüberschreitung bei Verarbeitung des Videos {url} – abgebrochen.")
+                results[url] = dict(failure_result)
+                continue
             try:
-                clean_url = self._clean_youtube_url(url)
-                youtube_video = types.Part.from_uri(file_uri=clean_url, mime_type="video/*")
-                prompt_text = """
-Du bist ein Assistent, der YouTube-Videos aus Google Alerts zusammenfasst.
-Anweisungen:
-1. Fasse das Video in 2-3 Sätzen zusammen.
-2. Schätze die Betrachtungszeit in Minuten.
-
-Format:
-Summary: <Zusammenfassung>
-Reading Time: <geschätzte Minuten>
-"""
-                contents = [youtube_video, types.Part.from_text(text=prompt_text)]
-                generate_config = types.GenerateContentConfig(temperature=0, max_output_tokens=1024, response_modalities=["TEXT"])
-                response = self.genai_client.models.generate_content(model="gemini-3.1-flash-lite-preview", contents=contents, config=generate_config)
-                text = response.text.strip()
-                summary_match = re.search(r"Summary:\s*(.+)", text, re.IGNORECASE)
-                reading_time_match = re.search(r"Reading\s*Time:\s*(\d+)", text, re.IGNORECASE)
-                results[url] = {"summary": summary_match.group(1).strip() if summary_match else None, "reading_time": int(reading_time_match.group(1)) if reading_time_match else None}
-                logger.info(f"Alert erfolgreich verarbeitet: {url}")
+                results[url] = future.result()
+                logger.info(f"Video erfolgreich verarbeitet: {url}")
             except Exception as e:
-                logger.error(f"Fehler bei Verarbeitung des Alerts {url}: {e}")
-                results[url] = {"summary": None, "reading_time": None}
+                logger.error(f"Fehler bei Verarbeitung des Videos {url}: {e}")
+                results[url] = dict(failure_result)
         return results
 
     def _clean_youtube_url(self, url: str) -> str:
@@ -0,0 +1,117 @@
+"""Token-Budget-basierte Batch-Planung für LLM-Aufrufe.
+
+Der Planner schätzt pro Item Input- und Output-Tokens und packt Items
+greedy in Requests, die möglichst nah an (aber unter) dem Kontext- und
+Output-Limit des Modells liegen. Kommt eine Antwort abgeschnitten zurück
+(``MAX_TOKENS``), wird der Batch mit `split` halbiert und erneut gesendet.
+"""
+
+import logging
+
+from rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class TruncatedResponseError(RuntimeError):
+    """Die Modellantwort wurde am Output-Limit abgeschnitten."""
+
+
+class PlannedBatch:
+    """Ein geplanter Request mit Items und Token-Schätzung."""
+
+    def __init__(self, items, input_tokens, output_tokens, max_input_tokens, max_output_tokens):
+        self.items = items
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+
+    @property
+    def input_utilisation(self):
+        return self.input_tokens / self.max_input_tokens if self.max_input_tokens else 0.0
+
+    @property
+    def output_utilisation(self):
+        return self.output_tokens / self.max_output_tokens if self.max_output_tokens else 0.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return (
+            f"PlannedBatch(items={len(self.items)}, input={self.input_tokens}/{self.max_input_tokens}, "
+            f"output={self.output_tokens}/{self.max_output_tokens})"
+        )
+
+
+class BatchPlanner:
+    """Packt Items nach Input-/Output-Token-Budget.
+
+    ``base_input_tokens`` ist der feste Anteil jedes Requests (System-Prompt),
+    ``input_tokens(item)`` und ``output_tokens(item)`` schätzen den Anteil pro
+    Item. Ein einzelnes Item, das allein das Budget sprengt, bekommt einen
+    eigenen Batch (überlange Inhalte werden vorher gekürzt).
+    """
+
+    def __init__(self, max_input_tokens, max_output_tokens, base_input_tokens=0,
+                 input_tokens=None, output_tokens=None, max_items=None):
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.base_input_tokens = base_input_tokens
+        self.input_tokens = input_tokens or (lambda item: estimate_tokens(str(item)))
+        self.output_tokens = output_tokens or (lambda item: 0)
+        self.max_items = max_items
+
+    def _batch(self, items, input_tokens, output_tokens):
+        return PlannedBatch(items, input_tokens, output_tokens, self.max_input_tokens, self.max_output_tokens)
+
+    def plan(self, items):
+        """Teilt ``items`` in Batches; die Reihenfolge bleibt erhalten."""
+        batches = []
+        current = []
+        current_input = self.base_input_tokens
+        current_output = 0
+        for item in items:
+            item_input = self.input_tokens(item)
+            item_output = self.output_tokens(item)
+            if current and (
+                current_input + item_input > self.max_input_tokens
+                or current_output + item_output > self.max_output_tokens
+                or (self.max_items and len(current) >= self.max_items)
+            ):
+                batches.append(self._batch(current, current_input, current_output))
+                current = []
+                current_input = self.base_input_tokens
+                current_output = 0
+            current.append(item)
+            current_input += item_input
+            current_output += item_output
+        if current:
+            batches.append(self._batch(current, current_input, current_output))
+        return batches
+
+    def split(self, batch):
+        """Halbiert einen Batch (z. B. nach abgeschnittener Antwort)."""
+        if len(batch.items) < 2:
+            return [batch]
+        middle = len(batch.items) // 2
+        return self.plan(batch.items[:middle]) + self.plan(batch.items[middle:])
+
+    @staticmethod
+    def log_utilisation(batches, label):
+        """Protokolliert die Auslastung jedes Batches."""
+        for index, batch in enumerate(batches, start=1):
+            logger.info(
+                "%s-Batch %s/%s: %s Items, Input %s/%s Tokens (%.0f%%), Output %s/%s Tokens (%.0f%%)",
+                label,
+                index,
+                len(batches),
+                len(batch.items),
+                batch.input_tokens,
+                batch.max_input_tokens,
+                batch.input_utilisation * 100,
+                batch.output_tokens,
+                batch.max_output_tokens,
+                batch.output_utilisation * 100,
+            )
@@ -19,3 +19,92 @@ class SendmailConfig:
 
     # Nur Einträge der letzten X Stunden (None = kein Limit)
     TIME_WINDOW_HOURS = None
+
+    # Report zusätzlich als markdown_report.md schreiben (nur Debugging)
+    REPORT_DEBUG_FILE = os.getenv("REPORT_DEBUG_FILE", "false").lower() in ("1", "true", "yes")
+
+    # ── Gemini ────────────────────────────────────────────
+    GEMINI_MODEL = "gemini-3.1-flash-lite-preview"
+
+    # Kontext- und Output-Limit des Modells; Batches werden bis SAFETY_FACTOR davon gefüllt
+    GEMINI_CONTEXT_TOKENS = 1048576
+    GEMINI_MAX_OUTPUT_TOKENS = 65536
+    GEMINI_TOKEN_SAFETY_FACTOR = 0.8
+
+    # Quota des Modells (Requests/Tokens pro Minute) für den Token-Bucket
+    GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))
+    GEMINI_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+
+    # Max. parallel laufende Gemini-Batches
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+
+    # Wiederholungen nach Quota-Antworten (HTTP 429 / RESOURCE_EXHAUSTED)
+    GEMINI_QUOTA_RETRIES = 3
+
+    # Website-Summaries als JSON (response_schema) statt Freitext anfordern
+    WEBSITE_STRUCTURED_OUTPUT = os.getenv("WEBSITE_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
+    # Zusätzliche Durchläufe im selben Run für URLs ohne Ergebnis (nur JSON-Modus)
+    WEBSITE_SUMMARY_RETRIES = 1
+
+    # Max. URLs pro Website-Batch (zusätzlich zu den Token-Budgets)
+    WEBSITE_SUMMARY_BATCH_SIZE = int(os.getenv("WEBSITE_SUMMARY_BATCH_SIZE", "20"))
+
+    # Geschätzte Output-Tokens pro URL (für das TPM-Budget)
+    GEMINI_OUTPUT_TOKENS_PER_URL = 200
+
+    # ── Website-Inhalte ───────────────────────────────────
+    # Seiten vor der Zusammenfassung selbst laden und den Haupttext mitschicken
+    WEBSITE_PREFETCH = os.getenv("WEBSITE_PREFETCH", "true").lower() in ("1", "true", "yes")
+    FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "10"))
+    FETCH_TIMEOUT_SECONDS = 10
+
+    # Token-Budgets: pro Seite, pro Batch (Input) und pro Batch (Output).
+    # Default: knapp unter Modell-Limit, Input zusätzlich höchstens ein TPM-Budget.
+    WEBSITE_CONTENT_MAX_TOKENS = int(os.getenv("WEBSITE_CONTENT_MAX_TOKENS", "1500"))
+    WEBSITE_BATCH_INPUT_TOKENS = int(os.getenv(
+        "WEBSITE_BATCH_INPUT_TOKENS",
+        str(int(min(GEMINI_CONTEXT_TOKENS, GEMINI_TPM) * GEMINI_TOKEN_SAFETY_FACTOR)),
+    ))
+    WEBSITE_BATCH_OUTPUT_TOKENS = int(os.getenv(
+        "WEBSITE_BATCH_OUTPUT_TOKENS",
+        str(int(GEMINI_MAX_OUTPUT_TOKENS * GEMINI_TOKEN_SAFETY_FACTOR)),
+    ))
+
+    # ── YouTube ───────────────────────────────────────────
+    # Max. parallele Video-Aufrufe, Timeout pro Aufruf und Gesamt-Deadline (Sekunden)
+    YOUTUBE_MAX_CONCURRENCY = int(os.getenv("YOUTUBE_MAX_CONCURRENCY", "4"))
+    YOUTUBE_CALL_TIMEOUT_SECONDS = int(os.getenv("YOUTUBE_CALL_TIMEOUT_SECONDS", "90"))
+    YOUTUBE_TOTAL_TIMEOUT_SECONDS = int(os.getenv("YOUTUBE_TOTAL_TIMEOUT_SECONDS", "180"))
+
+    # Geschätzte Tokens pro Video-Aufruf (für das TPM-Budget)
+    YOUTUBE_ESTIMATED_TOKENS = 20000
+
+    # ── LLM-Cache ─────────────────────────────────────────
+    # "firestore" (Collection llm_cache), "local" (JSON-Dateien) oder "off"
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "firestore")
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "/tmp/llm_cache")
+    LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+
+    # ── Hacker News ───────────────────────────────────────
+    # Algolia-Endpunkte und öffentliche Such-Zugangsdaten von hn.algolia.com (nur Lesezugriff);
+    # per Umgebungsvariable überschreibbar, z. B. für einen lokalen Stub-Server.
+    HN_SEARCH_URL = os.getenv("HN_SEARCH_URL", "https://hn.algolia.com/api/v1/search")
+    HN_ALGOLIA_APP_ID = os.getenv("HN_ALGOLIA_APP_ID", "UJ5WYC0L7X")
+    HN_ALGOLIA_API_KEY = os.getenv("HN_ALGOLIA_API_KEY", "28f0e1ec37a5e792e6845e67da5f20dd")
+    HN_MULTI_QUERY_URL = os.getenv(
+        "HN_MULTI_QUERY_URL",
+        f"https://{HN_ALGOLIA_APP_ID.lower()}-dsn.algolia.net/1/indexes/*/queries",
+    )
+
+    # Max. parallele Einzelabfragen (Fallback) und Gesamt-Deadline aller HN-Abfragen (Sekunden)
+    HN_MAX_WORKERS = int(os.getenv("HN_MAX_WORKERS", "10"))
+    HN_TOTAL_TIMEOUT_SECONDS = int(os.getenv("HN_TOTAL_TIMEOUT_SECONDS", "30"))
+
+    # ── Inhalts-Cache ─────────────────────────────────────
+    # Mit dem Podcast geteilte Collection content_cache (Key = Hash der kanonischen URL).
+    # Jünger als FRESH_HOURS → ohne Request verwenden, sonst bedingter GET (ETag).
+    CONTENT_CACHE_ENABLED = os.getenv("CONTENT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CONTENT_CACHE_FRESH_HOURS = 24
+    CONTENT_CACHE_TTL_DAYS = 7
+    CONTENT_CACHE_MAX_CHARS = 50000
@@ -0,0 +1,131 @@
+"""
+Main-content extraction for podcast inputs.
+
+Parses HTML with lxml and picks the main content container with a
+readability-style scorer. Paragraphs vote for their parent and
+grandparent, weighted by text length and comma count. Class/id hints
+adjust the score, and link density penalises navigation blocks. Text
+is collected from leaf blocks only, so nested elements (e.g. `<p>` inside
+`<article>`) are not counted twice, and repeated paragraphs are dropped.
+`<div>`s without block children count as paragraphs, so layouts built
+from divs and `<br>`s are scored too. If no paragraph qualifies, the text
+of the best container (or `<body>`) is returned as a whole.
+
+This module is kept identical in functions/podcast and functions/sendmail:
+both write the shared `content_cache` collection. Each cache entry stores
+`EXTRACTOR_VERSION`, and entries from another version are ignored on read.
+Bump it whenever the extraction output changes.
+"""
+
+import re
+from typing import Dict, List, Optional, Set
+
+import lxml.html
+from lxml import etree
+
+EXTRACTOR_VERSION: str = "lxml-readability-2"
+
+BOILERPLATE_TAGS: List[str] = [
+    "script", "style", "noscript", "nav", "header", "footer", "aside",
+    "form", "iframe", "svg", "button", "template",
+]
+NEGATIVE_HINTS = re.compile(r"comment|meta|footer|footnote|sidebar|sponsor|promo|related|share|social|nav|menu|cookie|banner|ad-", re.IGNORECASE)
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+
+SCORE_TAGS = ("p", "pre", "td")
+TEXT_TAGS = ("h1", "h2", "h3", "p", "li", "pre", "blockquote")
+HEADING_TAGS = ("h1", "h2", "h3")
+BLOCK_TAGS = (
+    "address", "article", "aside", "blockquote", "div", "dl", "fieldset", "figure", "footer",
+    "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "li", "main", "ol", "p", "pre",
+    "section", "table", "ul",
+)
+MIN_PARAGRAPH_CHARS = 25
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _class_weight(element: etree._Element) -> int:
+    hints = f"{element.get('class') or ''} {element.get('id') or ''}".strip()
+    if not hints:
+        return 0
+    weight = 0
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    return weight
+
+
+def _link_density(element: etree._Element, text_length: int) -> float:
+    link_length = sum(len(_normalize(a.text_content())) for a in element.iter("a"))
+    return link_length / max(text_length, 1)
+
+
+def _is_leaf_div(element: etree._Element) -> bool:
+    return element.tag == "div" and next(element.iterdescendants(*BLOCK_TAGS), None) is None
+
+
+def _best_container(root: etree._Element) -> Optional[etree._Element]:
+    scores: Dict[etree._Element, float] = {}
+    for paragraph in root.iter(*SCORE_TAGS, "div"):
+        if paragraph.tag == "div" and not _is_leaf_div(paragraph):
+            continue
+        text = _normalize(paragraph.text_content())
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _class_weight(ancestor)
+            scores[ancestor] += score * share
+
+    best: Optional[etree._Element] = None
+    best_score = 0.0
+    for container, score in scores.items():
+        text_length = len(_normalize(container.text_content()))
+        adjusted = score * (1 - _link_density(container, text_length))
+        if adjusted > best_score:
+            best, best_score = container, adjusted
+    return best
+
+
+def extract_main_text(html: bytes) -> str:
+    """Return the deduplicated main text of an HTML page (newline-separated)."""
+    if not html:
+        return ""
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ""
+    etree.strip_elements(root, *BOILERPLATE_TAGS, etree.Comment, with_tail=False)
+
+    container = _best_container(root)
+    if container is None:
+        body = root.find("body")
+        container = body if body is not None else root
+
+    seen: Set[str] = set()
+    paragraphs: List[str] = []
+    for element in container.iter(*TEXT_TAGS, "div"):
+        # Leaf blocks only, otherwise nested text would be counted twice
+        if element.tag == "div":
+            if not _is_leaf_div(element):
+                continue
+        elif next(element.iterdescendants("p", "li"), None) is not None:
+            continue
+        text = _normalize(element.text_content())
+        if len(text) < MIN_PARAGRAPH_CHARS and element.tag not in HEADING_TAGS:
+            continue
+        if text and text not in seen:
+            seen.add(text)
+            paragraphs.append(text)
+    if not paragraphs:
+        return _normalize(container.text_content())
+    return "\n".join(paragraphs)
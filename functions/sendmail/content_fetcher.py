@@ -0,0 +1,199 @@
+"""Lädt Webseiten vor der Zusammenfassung und extrahiert den Haupttext.
+
+Seiten werden parallel über eine gepoolte `requests.Session` geladen. Der
+Hauptinhalt wird mit `content_extractor.extract_main_text` (lxml +
+Readability-Heuristik, identisch zur Podcast-Function) bestimmt und auf ein
+Token-Budget gekürzt.
+Gemini bekommt so den Seiteninhalt direkt und muss die URL nicht selbst
+abrufen.
+
+Extrahierte Texte landen in der Firestore-Collection `content_cache`, die
+auch die Podcast-Function nutzt (Key = Hash der kanonischen URL). Jeder
+Eintrag trägt die ``EXTRACTOR_VERSION``; Einträge einer anderen Version
+gelten als Cache-Miss, damit der Text nicht davon abhängt, welche Function
+eine URL zuerst geladen hat. Frische Einträge werden ohne Request
+verwendet, ältere per ETag/Last-Modified bedingt neu abgefragt.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import SendmailConfig
+from helpers import canonical_url
+
+logger = logging.getLogger(__name__)
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+CONTENT_CACHE_COLLECTION = "content_cache"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Gibt die prozessweit geteilte Session mit Connection-Pool zurück."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=SendmailConfig.FETCH_MAX_WORKERS,
+                pool_maxsize=SendmailConfig.FETCH_MAX_WORKERS,
+                max_retries=1,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(REQUEST_HEADERS)
+            _session = session
+    return _session
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Kürzt Text auf ~``max_tokens`` Tokens (an Wortgrenzen)."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars]
+
+
+def content_cache_key(url):
+    """Dokument-ID einer URL in `content_cache` (identisch zur Podcast-Function)."""
+    return hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+
+def _is_fresh(document, now):
+    fetched_at = document.get("fetched_at")
+    if fetched_at is None:
+        return False
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return now - fetched_at < timedelta(hours=SendmailConfig.CONTENT_CACHE_FRESH_HOURS)
+
+
+def _load_cache(keys):
+    if not SendmailConfig.CONTENT_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        from database import get_cache_documents
+        documents = get_cache_documents(CONTENT_CACHE_COLLECTION, keys)
+    except Exception as e:
+        logger.warning(f"Inhalts-Cache konnte nicht geladen werden: {e}")
+        return {}
+    from content_extractor import EXTRACTOR_VERSION
+    return {key: doc for key, doc in documents.items() if doc.get("extractor") == EXTRACTOR_VERSION}
+
+
+def _store_cache(documents):
+    if not SendmailConfig.CONTENT_CACHE_ENABLED or not documents:
+        return
+    try:
+        from database import set_cache_documents
+        failed = set_cache_documents(CONTENT_CACHE_COLLECTION, documents)
+        if failed:
+            logger.warning(f"{len(failed)} Einträge im Inhalts-Cache konnten nicht gespeichert werden.")
+    except Exception as e:
+        logger.warning(f"Inhalts-Cache konnte nicht gespeichert werden: {e}")
+
+
+def fetch_page_document(url, cached=None, timeout=None):
+    """Lädt eine Seite und liefert ein Cache-Dokument oder ``None``.
+
+    Ist ``cached`` gesetzt, wird mit ETag/Last-Modified bedingt abgefragt;
+    bei ``304 Not Modified`` wird der gecachte Text weiterverwendet.
+    """
+    timeout = timeout or SendmailConfig.FETCH_TIMEOUT_SECONDS
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        response = get_session().get(url, headers=headers, timeout=timeout)
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(days=SendmailConfig.CONTENT_CACHE_TTL_DAYS)
+        if response.status_code == 304 and cached:
+            logger.debug(f"Seite unverändert (304): {url}")
+            return {**cached, "fetched_at": now, "expires_at": expires_at}
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            logger.debug(f"Überspringe Nicht-HTML-Inhalt ({content_type}) für {url}")
+            return None
+        from content_extractor import EXTRACTOR_VERSION, extract_main_text
+        text = extract_main_text(response.content)
+        if not text:
+            return None
+        return {
+            "url": canonical_url(url),
+            "extractor": EXTRACTOR_VERSION,
+            "text": text[:SendmailConfig.CONTENT_CACHE_MAX_CHARS],
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "expires_at": expires_at,
+        }
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Seite konnte nicht geladen werden ({url}): {e}")
+    except Exception as e:
+        logger.warning(f"Fehler beim Extrahieren von {url}: {e}")
+    return None
+
+
+def fetch_page_text(url, timeout=None):
+    """Lädt eine Seite und liefert den extrahierten Haupttext oder ``None``."""
+    document = fetch_page_document(url, timeout=timeout)
+    return document["text"] if document else None
+
+
+def fetch_page_contents(urls, max_tokens_per_item=None):
+    """Lädt alle URLs parallel und gibt ``{url: gekürzter Text}`` zurück.
+
+    Frische Einträge aus `content_cache` werden ohne Request verwendet.
+    URLs ohne verwertbaren Inhalt fehlen im Ergebnis; für sie ruft Gemini
+    die Seite weiterhin selbst ab.
+    """
+    if not urls:
+        return {}
+    max_tokens_per_item = max_tokens_per_item or SendmailConfig.WEBSITE_CONTENT_MAX_TOKENS
+    now = datetime.now(timezone.utc)
+    keys = {url: content_cache_key(url) for url in urls}
+    cached = _load_cache(sorted(set(keys.values())))
+
+    texts = {}
+    to_fetch = []
+    for url in urls:
+        document = cached.get(keys[url])
+        if document and document.get("text") and _is_fresh(document, now):
+            texts[url] = document["text"]
+        else:
+            to_fetch.append(url)
+
+    if to_fetch:
+        max_workers = max(1, min(SendmailConfig.FETCH_MAX_WORKERS, len(to_fetch)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            documents = list(executor.map(lambda url: fetch_page_document(url, cached.get(keys[url])), to_fetch))
+        updates = {}
+        for url, document in zip(to_fetch, documents):
+            if document:
+                texts[url] = document["text"]
+                updates[keys[url]] = document
+        _store_cache(updates)
+
+    contents = {url: truncate_to_tokens(text, max_tokens_per_item) for url, text in texts.items()}
+    logger.info(
+        f"Seiteninhalte vorab geladen: {len(contents)}/{len(urls)} URLs "
+        f"({len(urls) - len(to_fetch)} aus dem Inhalts-Cache)."
+    )
+    return contents
@@ -9,9 +9,8 @@ Einheitliches Schema:
 # package imports
 import os
 import json
+import threading
 from dotenv import load_dotenv
-from firebase_admin import credentials, firestore, initialize_app
-import firebase_admin
 from urllib.parse import urlparse, parse_qs, unquote
 import re
 from datetime import datetime, timezone
@@ -27,6 +26,8 @@ SERVICE_ACCOUNT_KEY_PATH = "serviceAccountKey.json"
 
 
 def get_firebase_credentials():
+    from firebase_admin import credentials
+
     secret_env = "RSS_FIREBASE_KEY"
 
     if secret_env in os.environ:
@@ -50,6 +51,9 @@ def get_firebase_credentials():
 
 
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import initialize_app
+
     if not firebase_admin._apps:
         cred = get_firebase_credentials()
         initialize_app(cred)
@@ -58,10 +62,21 @@ def initialize_firebase():
         default_logger.debug("Firebase war bereits initialisiert – überspringe.")
 
 
-initialize_firebase()
+# Firestore-Client wird erst beim ersten Zugriff erstellt (kürzerer Kaltstart)
+_db = None
+_db_lock = threading.Lock()
+
 
-# Firestore-Client wird erstellt
-db = firestore.client()
+def get_db():
+    """Gibt den Firestore-Client zurück; Firebase wird beim ersten Aufruf initialisiert."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                from firebase_admin import firestore
+                initialize_firebase()
+                _db = firestore.client()
+    return _db
 
 
 # Die folgenden Funktionen sind identisch zu denen im Hauptrepo
@@ -84,11 +99,44 @@ def safe_url(google_url: str) -> str:
     return url
 
 
-# Fügt Einträge in die Datenbank ein oder aktualisiert bestehende Einträge
-
-def add_datarecord(url, category=None, summary=None, reading_time=None, sub_category=None,
-                   mail_sent=False, hn_points=None, processed=None):
-    """Aktualisiert einen Eintrag mit LLM-Ergebnissen (einheitliches Schema)."""
+# Maximale Anzahl Writes pro Firestore-WriteBatch
+BATCH_WRITE_LIMIT = 500
+
+# Max. geschätzte Nutzdaten pro Commit (Puffer unter dem 10-MiB-Request-Limit)
+BATCH_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _estimate_size(value):
+    """Schätzt die Firestore-Speichergröße eines Werts in Bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(str(key).encode("utf-8")) + 1 + _estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value)
+    if value is None or isinstance(value, bool):
+        return 1
+    return 8
+
+
+def _chunks_by_size(documents, max_docs=BATCH_WRITE_LIMIT, max_bytes=BATCH_MAX_BYTES):
+    """Teilt ``{doc_id: data}`` in Chunks mit höchstens ``max_docs`` Dokumenten und ``max_bytes``."""
+    chunk, chunk_bytes = {}, 0
+    for doc_id, data in documents.items():
+        size = len(doc_id) + 32 + _estimate_size(data)
+        if chunk and (len(chunk) >= max_docs or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = {}, 0
+        chunk[doc_id] = data
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _build_update_data(url, category=None, summary=None, reading_time=None, sub_category=None,
+                       mail_sent=False, hn_points=None, processed=None):
     update_data = {
         "processed": True,
         "time_stamp": datetime.now(timezone.utc),
@@ -108,24 +156,149 @@ def add_datarecord(url, category=None, summary=None, reading_time=None, sub_cate
         update_data["hn_points"] = hn_points
     if processed is not None:
         update_data["processed"] = processed
+    return update_data
+
+
+def _commit_in_chunks(operations, chunk_size=BATCH_WRITE_LIMIT, collection_name="website", isolate_failures=False):
+    """Führt ``(doc_id, apply)``-Operationen in WriteBatches à ``chunk_size`` aus.
+
+    ``apply(batch, doc_ref)`` registriert den Write im Batch. Schlägt ein
+    Commit fehl, werden die Dokument-IDs des Chunks als fehlgeschlagen
+    gemeldet und die restlichen Chunks trotzdem geschrieben. Mit
+    ``isolate_failures=True`` wird ein fehlgeschlagener Chunk dokumentweise
+    wiederholt, sodass nur die tatsächlich fehlerhaften IDs (z. B.
+    ``NotFound`` bei ``update``) gemeldet werden.
+    """
+    db = get_db()
+    failed = []
+    collection = db.collection(collection_name)
+    for start in range(0, len(operations), chunk_size):
+        chunk = operations[start:start + chunk_size]
+        batch = db.batch()
+        for doc_id, apply in chunk:
+            apply(batch, collection.document(doc_id))
+        try:
+            batch.commit()
+            default_logger.debug(f"Batch committed: {start + len(chunk)}/{len(operations)} Dokumente.")
+        except Exception as e:
+            default_logger.error(f"Batch-Commit für {len(chunk)} Dokumente fehlgeschlagen: {e}")
+            if not isolate_failures or len(chunk) == 1:
+                failed.extend(doc_id for doc_id, _ in chunk)
+                continue
+            for doc_id, apply in chunk:
+                single = db.batch()
+                apply(single, collection.document(doc_id))
+                try:
+                    single.commit()
+                except Exception as single_error:
+                    default_logger.warning(f"Write für {doc_id} fehlgeschlagen: {single_error}")
+                    failed.append(doc_id)
+    return failed
+
 
+# Fügt Einträge in die Datenbank ein oder aktualisiert bestehende Einträge
+
+def add_datarecord(url, category=None, summary=None, reading_time=None, sub_category=None,
+                   mail_sent=False, hn_points=None, processed=None):
+    """Aktualisiert einen Eintrag mit LLM-Ergebnissen (einheitliches Schema)."""
+    db = get_db()
+    update_data = _build_update_data(
+        url, category=category, summary=summary, reading_time=reading_time,
+        sub_category=sub_category, mail_sent=mail_sent, hn_points=hn_points, processed=processed,
+    )
     db.collection("website").document(safe_url(url)).set(update_data, merge=True)
     default_logger.info(f"Datensatz aktualisiert: {url}")
 
 
+def add_datarecords(records, chunk_size=BATCH_WRITE_LIMIT):
+    """Bulk-Variante von `add_datarecord` über WriteBatches.
+
+    ``records`` sind Dicts mit ``url`` und optional ``doc_id`` sowie den
+    Feldern von `add_datarecord`. Ist ``doc_id`` bekannt, wird sie direkt
+    verwendet. Gibt die Liste der Dokument-IDs zurück, deren Write
+    fehlgeschlagen ist.
+    """
+    operations = []
+    for record in records:
+        url = record.get("url")
+        if not url:
+            default_logger.warning(f"Kein URL-Feld für Datensatz: {record}")
+            continue
+        update_data = _build_update_data(
+            url,
+            category=record.get("category"),
+            summary=record.get("summary"),
+            reading_time=record.get("reading_time"),
+            sub_category=record.get("sub_category"),
+            mail_sent=record.get("mail_sent", False),
+            hn_points=record.get("hn_points"),
+            processed=record.get("processed"),
+        )
+        doc_id = record.get("doc_id") or safe_url(url)
+        operations.append((doc_id, lambda batch, ref, data=update_data: batch.set(ref, data, merge=True)))
+
+    failed = _commit_in_chunks(operations, chunk_size)
+    default_logger.info(f"{len(operations) - len(failed)} von {len(operations)} Datensätzen aktualisiert.")
+    return failed
+
+
 # Prüft, ob eine URL bereits in der Datenbank existiert
 
 def is_duplicate_url(url):
+    db = get_db()
     doc = db.collection("website").document(safe_url(url)).get()
     return doc.exists
 
 
+# Felder, die der Sendmail-Workflow pro Eintrag tatsächlich nutzt (Projektion)
+UNSENT_ENTRY_FIELDS = [
+    "url", "source", "feed", "category", "summary",
+    "sub_category", "reading_time", "hn_points", "time_stamp",
+]
+
+UNPROCESSED_URL_FIELDS = ["url", "source"]
+
+
+def _project(query, fields=None, keys_only=False):
+    """Beschränkt eine Query auf die angegebenen Felder.
+
+    Mit ``keys_only=True`` werden nur Dokument-IDs übertragen – ideal zum
+    Zählen und Sammeln von IDs, ohne lange ``summary``-Felder zu laden.
+    """
+    if keys_only:
+        from firebase_admin import firestore
+        return query.select([firestore.FieldPath.document_id()])
+    if fields:
+        return query.select(list(fields))
+    return query
+
+
 # Holt alle Artikel, die noch nicht per Mail gesendet wurden
 
-def get_unsent_entries():
+def get_unsent_entries(fields=None, keys_only=False, limit=None):
+    """Lädt alle Einträge mit ``mail_sent=False``.
+
+    ``fields`` schränkt die übertragenen Felder ein (Default:
+    ``UNSENT_ENTRY_FIELDS``); ``url`` wird immer mitgeladen. Mit
+    ``keys_only=True`` wird nur eine Liste der Dokument-IDs zurückgegeben,
+    ``limit`` begrenzt die Anzahl der gelesenen Dokumente.
+    """
+    db = get_db()
     default_logger.info("Lade Einträge aus Firestore mit mail_sent=False ...")
+    fields = list(fields) if fields else list(UNSENT_ENTRY_FIELDS)
+    if "url" not in fields:
+        fields.append("url")
     try:
-        query = db.collection("website").where("mail_sent", "==", False).stream()
+        query = _project(
+            db.collection("website").where("mail_sent", "==", False),
+            fields=fields,
+            keys_only=keys_only,
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        query = query.stream()
+        if keys_only:
+            return [doc.id for doc in query]
     except Exception as e:
         default_logger.error(f"Fehler beim Abrufen der Einträge: {e}")
         return []
@@ -139,43 +312,69 @@ def get_unsent_entries():
             default_logger.warning(f"Überspringe Eintrag ohne gültige URL: {data}")
             continue
 
-        entry = {
-            "doc_id": doc.id,
-            "url": url,
-            "source": data.get("source"),
-            "feed": data.get("feed"),
-            "category": data.get("category"),
-            "summary": data.get("summary"),
-            "sub_category": data.get("sub_category"),
-            "reading_time": data.get("reading_time"),
-            "hn_points": data.get("hn_points"),
-            "time_stamp": data.get("time_stamp"),
-        }
+        entry = {"doc_id": doc.id}
+        for field in fields:
+            entry[field] = data.get(field)
         entries.append(entry)
-        default_logger.debug(f"Hinzugefügt: {entry['url']} (Kategorie: {entry['category']}, Sub-Kategorie: {entry['sub_category']})")
+        default_logger.debug(f"Hinzugefügt: {entry['url']} (Kategorie: {entry.get('category')}, Sub-Kategorie: {entry.get('sub_category')})")
 
     return entries
 
 
+def count_unsent_entries():
+    """Zählt ungesendete Einträge über eine Keys-only-Query."""
+    return len(get_unsent_entries(keys_only=True))
+
+
+def has_unsent_entries():
+    """Prüft per Keys-only-Query mit ``limit(1)``, ob es ungesendete Einträge gibt."""
+    return bool(get_unsent_entries(keys_only=True, limit=1))
+
+
 # Markiert eine übergebene Liste von Artikeln in der Datenbank als gesendet
 
-def mark_as_sent(entries):
-    for entry in entries:
-        url = entry.get("url")
-        if not url:
-            default_logger.warning(f"Kein URL-Feld für Eintrag: {entry}")
-            continue
-        db.collection("website").document(safe_url(url)).update({"mail_sent": True})
+def mark_as_sent(entries, chunk_size=BATCH_WRITE_LIMIT):
+    """Setzt ``mail_sent=True`` per WriteBatch und gibt fehlgeschlagene IDs zurück.
 
-    # logger.info(f"{len(entries)} Einträge wurden als gesendet markiert.")
+    Geschrieben wird mit ``update``, damit für inzwischen gelöschte Einträge
+    keine Stub-Dokumente ohne ``url`` entstehen. Scheitert ein Batch (z. B.
+    an ``NotFound``), wird er dokumentweise wiederholt; nur die fehlerhaften
+    IDs landen in der Rückgabe.
+    """
+    operations = []
+    for entry in entries:
+        doc_id = entry.get("doc_id")
+        if not doc_id:
+            url = entry.get("url")
+            if not url:
+                default_logger.warning(f"Kein URL-Feld für Eintrag: {entry}")
+                continue
+            doc_id = safe_url(url)
+        operations.append((doc_id, lambda batch, ref: batch.update(ref, {"mail_sent": True})))
+
+    failed = _commit_in_chunks(operations, chunk_size, isolate_failures=True)
+    default_logger.info(f"{len(operations) - len(failed)} Einträge wurden als gesendet markiert.")
+    if failed:
+        default_logger.warning(f"{len(failed)} Einträge konnten nicht als gesendet markiert werden: {failed}")
+    return failed
 
 
 # Holt alle unverarbeiteten URLs (inkl. Info ob es sich um Alerts handelt)
 
-def get_unprocessed_urls():
+def get_unprocessed_urls(keys_only=False):
+    """Lädt unverarbeitete URLs; mit ``keys_only=True`` nur die Dokument-IDs."""
+    db = get_db()
+    query = _project(
+        db.collection("website").where("processed", "==", False),
+        fields=UNPROCESSED_URL_FIELDS,
+        keys_only=keys_only,
+    )
+    if keys_only:
+        return [doc.id for doc in query.stream()]
+
     urls = []
-    for doc in db.collection("website").where("processed", "==", False).stream():
-        data = doc.to_dict()
+    for doc in query.stream():
+        data = doc.to_dict() or {}
         urls.append(
             {
                 "url": data.get("url"),
@@ -188,8 +387,51 @@ def get_unprocessed_urls():
 # Prüft, ob eine bestimmte URL als Alert markiert ist (source == "alerts")
 
 def is_alert(url):
+    db = get_db()
     doc_ref = db.collection("website").document(safe_url(url)).get()
     if doc_ref.exists:
         data = doc_ref.to_dict()
         return data.get("source") == "alerts"
     return False
+
+
+# Cache-Collections (z. B. `llm_cache`): Lesen/Schreiben per Dokument-ID
+
+def get_cache_documents(collection_name, doc_ids):
+    """Lädt mehrere Cache-Dokumente in einem Roundtrip (``get_all``)."""
+    if not doc_ids:
+        return {}
+    db = get_db()
+    collection = db.collection(collection_name)
+    refs = [collection.document(doc_id) for doc_id in doc_ids]
+    documents = {}
+    try:
+        for doc in db.get_all(refs):
+            if doc.exists:
+                documents[doc.id] = doc.to_dict() or {}
+    except Exception as e:
+        default_logger.error(f"Fehler beim Lesen aus {collection_name}: {e}")
+    return documents
+
+
+def set_cache_documents(collection_name, documents, chunk_size=BATCH_WRITE_LIMIT, max_bytes=BATCH_MAX_BYTES):
+    """Schreibt ``{doc_id: data}`` per WriteBatch; gibt fehlgeschlagene IDs zurück.
+
+    Ein Batch enthält höchstens ``chunk_size`` Dokumente und etwa
+    ``max_bytes`` Nutzdaten, damit große Cache-Dokumente (z. B. Seiten-
+    inhalte) das Request-Limit eines Commits nicht überschreiten.
+    """
+    failed = []
+    for chunk in _chunks_by_size(documents, chunk_size, max_bytes):
+        operations = [
+            (doc_id, lambda batch, ref, data=data: batch.set(ref, data))
+            for doc_id, data in chunk.items()
+        ]
+        failed.extend(_commit_in_chunks(operations, chunk_size, collection_name=collection_name))
+    return failed
+
+
+def delete_cache_documents(collection_name, doc_ids, chunk_size=BATCH_WRITE_LIMIT):
+    """Löscht Cache-Dokumente per WriteBatch; gibt fehlgeschlagene IDs zurück."""
+    operations = [(doc_id, lambda batch, ref: batch.delete(ref)) for doc_id in doc_ids]
+    return _commit_in_chunks(operations, chunk_size, collection_name=collection_name)
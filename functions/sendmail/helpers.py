@@ -2,6 +2,7 @@ import os
 import json
 import logging
 import re
+from urllib.parse import urlparse, urlunparse, parse_qs, parse_qsl, unquote, urlencode
 
 logger = logging.getLogger(__name__)
 
@@ -43,3 +44,42 @@ def get_gemini_api_key():
             logger.info("Gemini API-Key aus %s geladen.", env_name)
             return sanitized
     return None
+
+
+# --------------------- URL-Normalisierung -------------------------------
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "si"}
+
+
+def canonical_url(url):
+    """Normalisiert eine URL für Cache-Keys.
+
+    Entpackt Google-Redirects, vereinheitlicht Schema/Host, entfernt
+    Tracking-Parameter, Fragment und abschliessenden Slash, sodass derselbe
+    Artikel aus RSS, Mastodon oder Alerts auf denselben Key abgebildet wird.
+    """
+    if not url:
+        return url
+    url = url.strip().rstrip(":")
+    parsed = urlparse(url)
+    if "google." in parsed.netloc and parsed.path == "/url":
+        qs = parse_qs(parsed.query)
+        target = qs.get("url") or qs.get("q")
+        if target:
+            return canonical_url(unquote(target[0]))
+
+    scheme = (parsed.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    netloc = parsed.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunparse((scheme, netloc, path, "", query, ""))
@@ -3,21 +3,98 @@
 Nutzt die Algolia-API von Hacker News, um Stories anhand der URL zu suchen.
 Gibt die Anzahl der Points der gefundenen Story zurück,
 oder None falls keine Ergebnisse gefunden werden oder ein Fehler auftritt.
+
+Unbekannte URLs werden gebündelt über den Algolia-Multi-Query-Endpunkt
+(`/1/indexes/*/queries`) abgefragt – eine HTTP-Anfrage für bis zu
+``HN_MULTI_QUERY_BATCH`` URLs. Schlägt eine Bündelanfrage fehl, wird auf
+Einzelabfragen zurückgefallen; diese laufen parallel (höchstens
+``HN_MAX_WORKERS``) über dieselbe Session. Alle Abfragen eines Laufs teilen
+sich eine Deadline (``HN_TOTAL_TIMEOUT_SECONDS``); was bis dahin nicht
+beantwortet ist, gilt als Fehler. Endpunkt und Zugangsdaten stehen in
+``SendmailConfig`` und sind per Umgebungsvariable überschreibbar.
+
+Anfragen laufen über eine geteilte `requests.Session` mit Connection-Pool.
+Ergebnisse werden pro kanonischer URL im Speicher und in der Firestore-
+Collection `hn_cache` gehalten. Die TTL wächst mit dem Alter der Story:
+frische Stories werden häufig aktualisiert, alte eingefroren.
 """
 
+import time
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from config import SendmailConfig
+from helpers import canonical_url
 
 logger = logging.getLogger(__name__)
 
+HN_CACHE_COLLECTION = "hn_cache"
+HN_MAX_WORKERS = SendmailConfig.HN_MAX_WORKERS
+HN_ALGOLIA_INDEX = "Item_production"
+HN_MULTI_QUERY_BATCH = 50
 
-def fetch_hn_points(url: str, timeout: int = 8):
-    """Ruft die HN-Punkte für eine URL ab. Gibt None zurück bei Fehler oder keinem Treffer."""
+# (max. Story-Alter, TTL) – ältere Stories werden nicht mehr aktualisiert
+HN_TTL_BY_AGE = [
+    (timedelta(days=1), timedelta(hours=1)),
+    (timedelta(days=3), timedelta(hours=6)),
+    (timedelta(days=7), timedelta(hours=24)),
+]
+# TTL für URLs ohne HN-Story (sie kann später noch gepostet werden)
+HN_NO_HIT_TTL = timedelta(hours=6)
+
+_session = None
+_session_lock = threading.Lock()
+_memory_cache = {}
+_memory_lock = threading.Lock()
+
+
+def get_session():
+    """Gibt die prozessweit geteilte Session mit Connection-Pool zurück."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HN_MAX_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _cache_key(url):
+    return hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()
+
+
+def _expires_at(story_created_at, now):
+    """TTL abhängig vom Story-Alter; ``None`` bedeutet eingefroren."""
+    if story_created_at is None:
+        return now + HN_NO_HIT_TTL
+    age = now - story_created_at
+    for max_age, ttl in HN_TTL_BY_AGE:
+        if age < max_age:
+            return now + ttl
+    return None
+
+
+def _is_fresh(record, now):
+    expires_at = record.get("expires_at")
+    return expires_at is None or expires_at > now
+
+
+def _fetch_hn_record(url, timeout=8):
+    """Fragt Algolia für eine URL ab und liefert einen Cache-Record oder None bei Fehler."""
     try:
         logger.debug(f"Abrufen der Hacker-News-Punkte für URL: {url} mit Timeout={timeout}")
 
-        r = requests.get(
-            "https://hn.algolia.com/api/v1/search",
+        r = get_session().get(
+            SendmailConfig.HN_SEARCH_URL,
             params={
                 "query": url,
                 "restrictSearchableAttributes": "url",
@@ -26,16 +103,7 @@ def fetch_hn_points(url: str, timeout: int = 8):
             timeout=timeout,
         )
         r.raise_for_status()
-        hits = r.json().get("hits", [])
-
-        if not hits:
-            logger.info(f"Keine HackerNews-Ergebnisse für URL: {url}")
-            return None
-
-        best = max(hits, key=lambda x: (x.get("points") or 0))
-        points = best.get("points") or 0
-        logger.info(f"HackerNews Story gefunden: {points} Punkte für {url}")
-        return points
+        return _record_from_hits(url, r.json().get("hits", []))
 
     except requests.exceptions.Timeout:
         logger.warning(f"Zeitüberschreitung nach {timeout}s für URL: {url}")
@@ -46,3 +114,173 @@ def fetch_hn_points(url: str, timeout: int = 8):
     except Exception as e:
         logger.error(f"Unerwarteter Fehler beim Abrufen der HN-Punkte für {url}: {e}")
         return None
+
+
+def _fetch_hn_records_batch(urls, timeout=8):
+    """Fragt bis zu ``HN_MULTI_QUERY_BATCH`` URLs mit einer Multi-Query ab.
+
+    Liefert eine Liste von Records in URL-Reihenfolge. Wirft bei HTTP-Fehlern
+    oder unpassender Antwort, damit der Aufrufer auf Einzelabfragen
+    zurückfallen kann.
+    """
+    body = {
+        "requests": [
+            {
+                "indexName": HN_ALGOLIA_INDEX,
+                "params": urlencode({
+                    "query": url,
+                    "restrictSearchableAttributes": "url",
+                    "tags": "story",
+                }),
+            }
+            for url in urls
+        ]
+    }
+    r = get_session().post(
+        SendmailConfig.HN_MULTI_QUERY_URL,
+        json=body,
+        headers={
+            "X-Algolia-Application-Id": SendmailConfig.HN_ALGOLIA_APP_ID,
+            "X-Algolia-API-Key": SendmailConfig.HN_ALGOLIA_API_KEY,
+        },
+        timeout=timeout,
+    )
+    r.raise_for_status()
+    results = r.json().get("results", [])
+    if len(results) != len(urls):
+        raise ValueError(f"Multi-Query lieferte {len(results)} Ergebnisse für {len(urls)} URLs.")
+    return [_record_from_hits(url, result.get("hits", [])) for url, result in zip(urls, results)]
+
+
+def _fetch_hn_records_single(urls, timeout, deadline):
+    """Einzelabfragen parallel über die geteilte Session, begrenzt durch die Deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return [None] * len(urls)
+    timeout = min(timeout, remaining)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(HN_MAX_WORKERS, len(urls))))
+    try:
+        futures = [executor.submit(_fetch_hn_record, url, timeout) for url in urls]
+        done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+        if not_done:
+            logger.warning(f"HN-Deadline erreicht – {len(not_done)} Einzelabfragen abgebrochen.")
+        return [future.result() if future in done else None for future in futures]
+    finally:
+        # Nicht auf hängende Requests warten; noch nicht gestartete verwerfen
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_hn_records(urls, timeout=8):
+    """Holt Records gebündelt; bei Fehlern einer Bündelanfrage parallele Einzelabfragen.
+
+    Alle Anfragen teilen sich die Deadline ``HN_TOTAL_TIMEOUT_SECONDS``;
+    URLs, die bis dahin nicht abgefragt wurden, liefern None.
+    """
+    deadline = time.monotonic() + SendmailConfig.HN_TOTAL_TIMEOUT_SECONDS
+    records = []
+    for start in range(0, len(urls), HN_MULTI_QUERY_BATCH):
+        chunk = urls[start:start + HN_MULTI_QUERY_BATCH]
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning(f"HN-Deadline erreicht – {len(urls) - start} URLs nicht abgefragt.")
+            records.extend([None] * (len(urls) - start))
+            break
+        try:
+            records.extend(_fetch_hn_records_batch(chunk, min(timeout, remaining)))
+            logger.debug(f"HN-Multi-Query für {len(chunk)} URLs erfolgreich.")
+        except Exception as e:
+            logger.warning(f"HN-Multi-Query fehlgeschlagen ({e}) – Einzelabfragen für {len(chunk)} URLs.")
+            records.extend(_fetch_hn_records_single(chunk, timeout, deadline))
+    return records
+
+
+def _record_from_hits(url, hits):
+    now = datetime.now(timezone.utc)
+    if not hits:
+        logger.info(f"Keine HackerNews-Ergebnisse für URL: {url}")
+        return {"url": canonical_url(url), "points": None, "story_created_at": None,
+                "fetched_at": now, "expires_at": _expires_at(None, now)}
+
+    best = max(hits, key=lambda x: (x.get("points") or 0))
+    points = best.get("points") or 0
+    created_at_i = best.get("created_at_i")
+    story_created_at = datetime.fromtimestamp(created_at_i, timezone.utc) if created_at_i else None
+    logger.info(f"HackerNews Story gefunden: {points} Punkte für {url}")
+    return {
+        "url": canonical_url(url),
+        "points": points,
+        "story_created_at": story_created_at,
+        "fetched_at": now,
+        # Story ohne Zeitstempel wie eine frische behandeln
+        "expires_at": _expires_at(story_created_at or now, now),
+    }
+
+
+def _load_persistent(keys):
+    try:
+        from database import get_cache_documents
+        return get_cache_documents(HN_CACHE_COLLECTION, keys)
+    except Exception as e:
+        logger.warning(f"HN-Cache konnte nicht aus Firestore geladen werden: {e}")
+        return {}
+
+
+def _store_persistent(records):
+    try:
+        from database import set_cache_documents
+        failed = set_cache_documents(HN_CACHE_COLLECTION, records)
+        if failed:
+            logger.warning(f"{len(failed)} HN-Cache-Einträge konnten nicht gespeichert werden.")
+    except Exception as e:
+        logger.warning(f"HN-Cache konnte nicht in Firestore gespeichert werden: {e}")
+
+
+def fetch_hn_points_many(urls, timeout=8):
+    """Liefert ``{url: points}`` für alle URLs, bevorzugt aus dem Cache.
+
+    Reihenfolge: Speicher-Cache, dann ein gebündelter Firestore-Read für
+    den Rest, dann gebündelte Algolia-Abfragen nur für abgelaufene oder
+    unbekannte URLs.
+    """
+    now = datetime.now(timezone.utc)
+    keys = {url: _cache_key(url) for url in urls}
+    records = {}
+
+    with _memory_lock:
+        for url, key in keys.items():
+            record = _memory_cache.get(key)
+            if record and _is_fresh(record, now):
+                records[url] = record
+
+    missing_keys = sorted({keys[url] for url in urls if url not in records})
+    if missing_keys:
+        stored = _load_persistent(missing_keys)
+        with _memory_lock:
+            for url, key in keys.items():
+                record = stored.get(key)
+                if url not in records and record and _is_fresh(record, now):
+                    records[url] = record
+                    _memory_cache[key] = record
+
+    to_fetch = list(dict.fromkeys(url for url in urls if url not in records))
+    logger.info(f"HN-Cache: {len(urls) - len(to_fetch)}/{len(urls)} Treffer, {len(to_fetch)} URLs bei Algolia abzufragen.")
+    if to_fetch:
+        fetched = _fetch_hn_records(to_fetch, timeout)
+
+        new_records = {}
+        with _memory_lock:
+            for url, record in zip(to_fetch, fetched):
+                if record is None:
+                    continue
+                records[url] = record
+                _memory_cache[keys[url]] = record
+                new_records[keys[url]] = record
+        if new_records:
+            _store_persistent(new_records)
+
+    return {url: (records[url].get("points") if url in records else None) for url in urls}
+
+
+def fetch_hn_points(url: str, timeout: int = 8):
+    """Ruft die HN-Punkte für eine URL ab. Gibt None zurück bei Fehler oder keinem Treffer."""
+    return fetch_hn_points_many([url], timeout=timeout).get(url)
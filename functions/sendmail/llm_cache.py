@@ -0,0 +1,168 @@
+"""Persistenter Cache für LLM-Ergebnisse.
+
+Ergebnisse werden content-addressed abgelegt: der Key ist ein Hash aus
+kanonischer URL, Modellname und Prompt-Version (Hash des System-Prompts).
+Ändert sich Prompt oder Modell, entstehen automatisch neue Keys.
+
+Backends:
+  - ``firestore`` (Default): Collection `llm_cache`
+  - ``local``: JSON-Dateien in ``LLM_CACHE_DIR`` (für lokale Tests)
+  - ``off``: Cache deaktiviert
+
+Einträge tragen ein ``expires_at``-Feld; abgelaufene Einträge werden beim
+Lesen ignoriert und entfernt. In Firestore kann zusätzlich eine TTL-Policy
+auf ``expires_at`` gesetzt werden.
+"""
+
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from config import SendmailConfig
+from helpers import canonical_url
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_COLLECTION = "llm_cache"
+
+
+def prompt_version(*parts):
+    """Kurzer Hash über alle Prompt-Bestandteile."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class _FirestoreBackend:
+    def __init__(self, collection_name):
+        # Import erst hier, damit das lokale Backend ohne Firebase auskommt
+        import database
+        self._db = database
+        self.collection_name = collection_name
+
+    def get_many(self, keys):
+        return self._db.get_cache_documents(self.collection_name, keys)
+
+    def set_many(self, documents):
+        failed = self._db.set_cache_documents(self.collection_name, documents)
+        if failed:
+            logger.warning("LLM-Cache: %s Einträge konnten nicht geschrieben werden.", len(failed))
+
+    def delete_many(self, keys):
+        self._db.delete_cache_documents(self.collection_name, keys)
+
+
+class _LocalBackend:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get_many(self, keys):
+        documents = {}
+        for key in keys:
+            path = self._path(key)
+            if not path.exists():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    documents[key] = json.load(file)
+            except Exception as e:
+                logger.warning("LLM-Cache: Datei %s nicht lesbar: %s", path, e)
+        return documents
+
+    def set_many(self, documents):
+        for key, data in documents.items():
+            with open(self._path(key), "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, default=str)
+
+    def delete_many(self, keys):
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+
+class LLMCache:
+    """Cache für LLM-Ergebnisse pro URL, Modell und Prompt-Version."""
+
+    def __init__(self, model, prompt_hash, backend=None, ttl_days=None):
+        self.model = model
+        self.prompt_hash = prompt_hash
+        self.ttl = timedelta(days=ttl_days if ttl_days is not None else SendmailConfig.LLM_CACHE_TTL_DAYS)
+        self.backend = backend if backend is not None else self._default_backend()
+
+    @staticmethod
+    def _default_backend():
+        backend_name = SendmailConfig.LLM_CACHE_BACKEND
+        if backend_name == "off":
+            return None
+        if backend_name == "local":
+            return _LocalBackend(SendmailConfig.LLM_CACHE_DIR)
+        try:
+            return _FirestoreBackend(LLM_CACHE_COLLECTION)
+        except Exception as e:
+            logger.warning("LLM-Cache: Firestore nicht verfügbar (%s) – nutze lokales Backend.", e)
+            return _LocalBackend(SendmailConfig.LLM_CACHE_DIR)
+
+    def key_for(self, url):
+        raw = f"{canonical_url(url)}|{self.model}|{self.prompt_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, urls):
+        """Liefert ``{url: result}`` für alle gültigen Cache-Treffer."""
+        if self.backend is None or not urls:
+            return {}
+        keys = {url: self.key_for(url) for url in urls}
+        try:
+            documents = self.backend.get_many(sorted(set(keys.values())))
+        except Exception as e:
+            logger.warning("LLM-Cache: Lesen fehlgeschlagen: %s", e)
+            return {}
+
+        now = datetime.now(timezone.utc)
+        hits, expired = {}, set()
+        for url, key in keys.items():
+            document = documents.get(key)
+            if not document:
+                continue
+            expires_at = document.get("expires_at")
+            if isinstance(expires_at, str):
+                expires_at = datetime.fromisoformat(expires_at)
+            if expires_at is not None and expires_at <= now:
+                expired.add(key)
+                continue
+            hits[url] = dict(document.get("result") or {})
+
+        if expired:
+            try:
+                self.backend.delete_many(sorted(expired))
+            except Exception as e:
+                logger.debug("LLM-Cache: Löschen abgelaufener Einträge fehlgeschlagen: %s", e)
+        logger.info("LLM-Cache: %s/%s Treffer.", len(hits), len(urls))
+        return hits
+
+    def put_many(self, results):
+        """Speichert ``{url: result}``; Fehler werden nur protokolliert."""
+        if self.backend is None or not results:
+            return
+        now = datetime.now(timezone.utc)
+        documents = {
+            self.key_for(url): {
+                "url": canonical_url(url),
+                "model": self.model,
+                "prompt_version": self.prompt_hash,
+                "result": result,
+                "created_at": now,
+                "expires_at": now + self.ttl,
+            }
+            for url, result in results.items()
+        }
+        try:
+            self.backend.set_many(documents)
+        except Exception as e:
+            logger.warning("LLM-Cache: Schreiben fehlgeschlagen: %s", e)
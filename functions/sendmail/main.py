@@ -15,6 +15,7 @@ angestossen.
 import os
 import sys
 import json
+import time
 import logging
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
@@ -24,11 +25,12 @@ from datetime import date
 
 # interne helpers
 from config import SendmailConfig
-from database import get_unsent_entries, mark_as_sent, add_datarecord
+from database import get_unsent_entries, has_unsent_entries, mark_as_sent, add_datarecords
 from helpers import get_gemini_api_key
-from mail_report_helpers import gmail_send_mail, create_markdown_report, cleanup_markdown_report
+from mail_report_helpers import gmail_send_mail
+from report import Report, is_reportable_entry
 from ai_helpers import AIService
-from hn_popularity import fetch_hn_points
+from hn_popularity import fetch_hn_points_many
 
 # Logger setup
 load_dotenv()
@@ -67,10 +69,99 @@ class SendMailService:
             raise RuntimeError("Kein Gemini API-Key konfiguriert. Cloud Function kann nicht starten.")
         
         logger.info("✓ Gemini API-Key erfolgreich geladen")
-        self.ai = AIService(self.gemini_api_key)
+        self._ai = None
+
+    @property
+    def ai(self):
+        """`AIService` erst beim ersten Zugriff bauen (inkl. LLM-Cache/Firestore).
+
+        Läufe ohne ungesendete Einträge kommen so ohne LLM-Setup aus.
+        """
+        if self._ai is None:
+            self._ai = AIService(self.gemini_api_key)
+        return self._ai
+
+    # ---- Merge helpers ----
+    @staticmethod
+    def _merge_summaries(entries, summaries):
+        """Überträgt LLM-Ergebnisse in die bereits geladenen Einträge.
+
+        Es werden nur Felder übernommen, die `add_datarecord` auch schreiben
+        würde; das Ergebnis entspricht damit dem Stand nach einem erneuten
+        DB-Load. Gibt die aktualisierten Einträge zurück.
+        """
+        by_url = {}
+        for entry in entries:
+            by_url.setdefault(entry["url"], entry)
+            by_url.setdefault(entry["url"].rstrip(":"), entry)
+
+        merged = []
+        for url, meta in summaries.items():
+            entry = by_url.get(url)
+            if entry is None:
+                logger.warning(f"Summary ohne passenden Eintrag verworfen: {url}")
+                continue
+            if meta.get("category"):
+                entry["category"] = meta["category"]
+            for field in ("summary", "reading_time", "sub_category", "hn_points"):
+                if meta.get(field) is not None:
+                    entry[field] = meta[field]
+            merged.append(entry)
+        return merged
+
+    @staticmethod
+    def _run_stages(stages, optional=()):
+        """Startet unabhängige Stufen gleichzeitig und wartet auf alle.
+
+        ``stages`` ist ``{name: (funktion, urls)}``. Gibt ``{name: ergebnis}``
+        zurück. Fehler in Pflichtstufen werden nach Abschluss aller Stufen
+        weitergereicht; fehlgeschlagene ``optional``-Stufen liefern ``None``.
+        """
+        if not stages:
+            return {}
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = {}
+            for name, (func, urls) in stages.items():
+                logger.info(f"Starte Stufe '{name}' mit {len(urls)} URLs...")
+                futures[name] = (executor.submit(func, urls), time.perf_counter())
+            for name, (future, started) in futures.items():
+                try:
+                    results[name] = future.result()
+                    logger.info(
+                        f"Stufe '{name}' fertig nach {time.perf_counter() - started:.1f}s "
+                        f"({len(results[name])} Ergebnisse)"
+                    )
+                except Exception as e:
+                    logger.error(f"Fehler in Stufe '{name}': {e}", exc_info=True)
+                    if name in optional:
+                        results[name] = None
+                    else:
+                        errors[name] = e
+        if errors:
+            raise next(iter(errors.values()))
+        return results
+
+    @staticmethod
+    def _wait_for_writes(pending_writes):
+        """Wartet auf asynchrone Bulk-Writes und protokolliert Teilfehler."""
+        for future in pending_writes:
+            try:
+                failed = future.result()
+            except Exception as e:
+                logger.error(f"Schreiben der Summaries fehlgeschlagen: {e}")
+                continue
+            if failed:
+                logger.warning(f"{len(failed)} Summary-Writes fehlgeschlagen: {failed}")
 
     # ---- Core workflow ----
     def run(self):
+        # Günstiger Keys-only-Check (limit 1), bevor Felder geladen werden
+        if not has_unsent_entries():
+            logger.info("Keine ungesendeten Einträge gefunden.")
+            return False
+
         unsent = get_unsent_entries()
         if not unsent:
             logger.info("Keine ungesendeten Einträge gefunden.")
@@ -109,103 +200,111 @@ class SendMailService:
             logger.info("Keine Einträge nach Filterung übrig.")
             return False
 
-        urls_without_summary = []
-        for e in unsent:
-            summary = e.get("summary")
-            if not summary or not str(summary).strip() or str(summary).strip().lower() in ["n/a", "none", "null"]:
-                urls_without_summary.append(e["url"])
-
-        logger.info(f"URLs ohne gültige Summary: {len(urls_without_summary)}")
-        logger.debug("URLs ohne Summary: %s", urls_without_summary)
-
-        if urls_without_summary:
-            youtube_urls = [u for u in urls_without_summary if "youtube.com" in u or "youtu.be" in u]
-            web_urls = [u for u in urls_without_summary if u not in youtube_urls]
-            
-            logger.info(f"Web-URLs zu verarbeiten: {len(web_urls)}, YouTube-URLs: {len(youtube_urls)}")
-            
-            summaries = {}
-            
-            if web_urls:
-                try:
-                    logger.info(f"Rufe summarise_and_categorize_websites mit {len(web_urls)} URLs auf...")
-                    web_results = self.ai.summarise_and_categorize_websites(web_urls)
-                    logger.info(f"summarise_and_categorize_websites returned {len(web_results)} results")
-                    summaries.update(web_results)
-                except Exception as e:
-                    logger.error(f"Fehler bei summarise_and_categorize_websites: {e}", exc_info=True)
-                    raise
-            
-            if youtube_urls:
-                try:
-                    logger.info(f"Rufe summarise_youtube_videos mit {len(youtube_urls)} URLs auf...")
-                    youtube_results = self.ai.summarise_youtube_videos(youtube_urls)
-                    logger.info(f"summarise_youtube_videos returned {len(youtube_results)} results")
-                    summaries.update(youtube_results)
-                except Exception as e:
-                    logger.error(f"Fehler bei summarise_youtube_videos: {e}", exc_info=True)
-                    raise
-            
-            logger.info(f"Gesamt Summaries erhalten: {len(summaries)}")
-
-            # HN-Punkte parallel für alle Nicht-Alert-URLs abrufen
-            alert_urls = {e["url"] for e in unsent if e.get("source") == "alerts"}
-            hn_fetch_urls = [url for url in summaries
-                 if url not in alert_urls
-                 and "youtube.com" not in url
-                 and "youtu.be" not in url]
-            hn_points_dict = {}
-            if hn_fetch_urls:
-                logger.info(f"Rufe HN-Punkte für {len(hn_fetch_urls)} URLs ab (parallel)...")
-                with ThreadPoolExecutor(max_workers=10) as executor:
-                    results = executor.map(fetch_hn_points, hn_fetch_urls)
-                    hn_points_dict = dict(zip(hn_fetch_urls, results))
-                logger.info("HN-Punkte abgerufen.")
-
-            for url, meta in summaries.items():
-                meta["hn_points"] = hn_points_dict.get(url)
-                logger.debug(f"Schreibe Summary für {url}: category={meta.get('category')}, summary={str(meta.get('summary'))[:50]}...")
-                add_datarecord(
-                    url=url,
-                    category=meta.get("category"),
-                    summary=meta.get("summary"),
-                    sub_category=meta.get("sub_category", None),
-                    reading_time=meta.get("reading_time"),
-                    hn_points=meta.get("hn_points"),
-                    mail_sent=False,
-                )
-            
-            # 🔑 KRITISCH: Nach LLM-Aufrufen DB nochmal laden, um die neuen Summaries zu holen!
-            logger.info("Lade aktualisierte Einträge aus DB...")
-            allowed_urls = {e["url"] for e in unsent}
-            unsent = [e for e in get_unsent_entries() if e["url"] in allowed_urls]
-            logger.info(f"Aktualisierte Einträge geladen: {len(unsent)}")
-
-        summaries_from_db = {
-            entry["url"]: {
-                "category": entry.get("category"),
-                "sub_category": entry.get("sub_category"),
-                "summary": entry.get("summary"),
-                "reading_time": entry.get("reading_time"),
-                "hn_points": entry.get("hn_points"),
-                "source": entry.get("source", ""),
+        pending_writes = []
+        try:
+            urls_without_summary = []
+            for e in unsent:
+                summary = e.get("summary")
+                if not summary or not str(summary).strip() or str(summary).strip().lower() in ["n/a", "none", "null"]:
+                    urls_without_summary.append(e["url"])
+
+            logger.info(f"URLs ohne gültige Summary: {len(urls_without_summary)}")
+            logger.debug("URLs ohne Summary: %s", urls_without_summary)
+
+            if urls_without_summary:
+                youtube_urls = [u for u in urls_without_summary if "youtube.com" in u or "youtu.be" in u]
+                web_urls = [u for u in urls_without_summary if u not in youtube_urls]
+                alert_urls = {e["url"] for e in unsent if e.get("source") == "alerts"}
+                hn_fetch_urls = [u for u in web_urls if u not in alert_urls]
+
+                logger.info(f"Web-URLs zu verarbeiten: {len(web_urls)}, YouTube-URLs: {len(youtube_urls)}, HN-URLs: {len(hn_fetch_urls)}")
+
+                # HN-Abruf braucht nur die URL und läuft daher parallel zu den
+                # LLM-Aufrufen; die Laufzeit entspricht der langsamsten Stufe.
+                stages = {}
+                if web_urls:
+                    stages["web"] = (self.ai.summarise_and_categorize_websites, web_urls)
+                if youtube_urls:
+                    stages["youtube"] = (self.ai.summarise_youtube_videos, youtube_urls)
+                if hn_fetch_urls:
+                    stages["hn"] = (fetch_hn_points_many, hn_fetch_urls)
+                results = self._run_stages(stages, optional={"hn"})
+
+                summaries = {}
+                summaries.update(results.get("web") or {})
+                summaries.update(results.get("youtube") or {})
+                logger.info(f"Gesamt Summaries erhalten: {len(summaries)}")
+
+                hn_points_dict = results.get("hn") or {}
+                for url, meta in summaries.items():
+                    meta["hn_points"] = hn_points_dict.get(url)
+
+                # LLM-Ergebnisse direkt in die geladenen Einträge übernehmen, statt
+                # die komplette Collection nach dem Schreiben erneut zu laden.
+                merged = self._merge_summaries(unsent, summaries)
+                logger.info(f"Summaries in {len(merged)} geladene Einträge übernommen.")
+
+                records = []
+                for entry in merged:
+                    logger.debug(f"Schreibe Summary für {entry['url']}: category={entry.get('category')}, summary={str(entry.get('summary'))[:50]}...")
+                    records.append({
+                        "doc_id": entry["doc_id"],
+                        "url": entry["url"],
+                        "category": entry.get("category"),
+                        "summary": entry.get("summary"),
+                        "sub_category": entry.get("sub_category"),
+                        "reading_time": entry.get("reading_time"),
+                        "hn_points": entry.get("hn_points"),
+                        "mail_sent": False,
+                    })
+                write_pool = ThreadPoolExecutor(max_workers=1)
+                pending_writes.append(write_pool.submit(add_datarecords, records))
+                write_pool.shutdown(wait=False)
+
+            report_entries = {
+                entry["url"]: {
+                    "category": entry.get("category"),
+                    "sub_category": entry.get("sub_category"),
+                    "summary": entry.get("summary"),
+                    "reading_time": entry.get("reading_time"),
+                    "hn_points": entry.get("hn_points"),
+                    "source": entry.get("source", ""),
+                }
+                for entry in unsent
             }
-            for entry in unsent
-        }
 
-        today_str = date.today()
-
-        create_markdown_report(summaries_from_db, MARKDOWN_REPORT_PATH)
-        cleanup_markdown_report(MARKDOWN_REPORT_PATH)
-        gmail_send_mail(
-            self.sender_email,
-            self.recipient_email,
-            subject=f"Today's News ({today_str})",
-            mail_body_file=MARKDOWN_REPORT_PATH,
-        )
-        mark_as_sent(unsent)
+            today_str = date.today()
+
+            report = Report.from_entries(report_entries, today_str)
+            if SendmailConfig.REPORT_DEBUG_FILE:
+                report.write_markdown(MARKDOWN_REPORT_PATH)
+            message_id = gmail_send_mail(
+                self.sender_email,
+                self.recipient_email,
+                subject=f"Today's News ({today_str})",
+                html_body=report.to_html(),
+                text_body=report.to_text(),
+            )
+        finally:
+            # Summary-Writes müssen vor mark_as_sent abgeschlossen sein, da sie
+            # mail_sent=False setzen und sonst das Sent-Flag überschreiben könnten.
+            # Auch bei Fehlern abwarten, damit kein Write beim Beenden verloren geht.
+            self._wait_for_writes(pending_writes)
+        if not message_id:
+            raise RuntimeError("Mailversand fehlgeschlagen – Einträge bleiben ungesendet.")
+
+        sent_entries = [e for e in unsent if is_reportable_entry(report_entries[e["url"]])]
+        if len(sent_entries) != len(unsent):
+            logger.info(f"{len(unsent) - len(sent_entries)} Einträge ohne verwertbare Summary bleiben ungesendet.")
+        failed_ids = mark_as_sent(sent_entries)
+        if failed_ids:
+            logger.error(f"{len(failed_ids)} Einträge wurden versendet, aber nicht als gesendet markiert: {failed_ids}")
         logger.info("Mailversand abgeschlossen.")
-        return {"entries_processed": len(unsent), "mail_sent_to": self.recipient_email}
+        return {
+            "entries_processed": len(sent_entries),
+            "mail_sent_to": self.recipient_email,
+            "mark_as_sent_failed": failed_ids,
+        }
 
 
 
@@ -224,6 +323,7 @@ def sendmail_trigger(request=None):
             "details": {
                 "entries_processed": result["entries_processed"],
                 "mail_sent_to": result["mail_sent_to"],
+                "mark_as_sent_failed": result["mark_as_sent_failed"],
             },
         }
         return json.dumps(response_data, indent=2), 200
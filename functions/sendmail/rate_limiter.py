@@ -0,0 +1,127 @@
+"""Token-Bucket-Limiter für Gemini-Aufrufe.
+
+Begrenzt gleichzeitig Requests pro Minute (RPM) und Tokens pro Minute (TPM)
+und wird von allen Threads eines `AIService` geteilt. Quota-Antworten von
+Gemini (HTTP 429 / RESOURCE_EXHAUSTED) pausieren den Limiter für die vom
+Server vorgeschlagene Wartezeit.
+"""
+
+import re
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUOTA_DELAY_SECONDS = 30.0
+
+_RETRY_DELAY_PATTERNS = [
+    re.compile(r"retry[_ ]?delay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+]
+
+
+def estimate_tokens(text):
+    """Grobe Token-Schätzung (~4 Zeichen pro Token)."""
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+
+def is_quota_error(exc):
+    """Prüft anhand des Statuscodes, ob ``exc`` ein Quota-Fehler ist.
+
+    Erkennt HTTP 429 (``exc.code``) und den Status RESOURCE_EXHAUSTED
+    (GenAI SDK: ``exc.status``, gRPC: ``exc.grpc_status_code``). Verpackte
+    Fehler (z. B. aus LangChain) werden über ``__cause__`` geprüft. Der
+    Fehlertext wird bewusst nicht ausgewertet.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        code = getattr(exc, "code", None)
+        if code == 429:
+            return True
+        status = getattr(exc, "status", None)
+        grpc_code = getattr(exc, "grpc_status_code", None)
+        if status == "RESOURCE_EXHAUSTED" or getattr(grpc_code, "name", None) == "RESOURCE_EXHAUSTED":
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def quota_retry_delay(exc):
+    """Liefert die Wartezeit in Sekunden, falls ``exc`` ein Quota-Fehler ist.
+
+    Die Einordnung erfolgt über ``is_quota_error``; ``retryDelay`` wird,
+    falls vorhanden, aus der Antwort gelesen. Gibt ``None`` zurück, wenn es
+    sich um keinen Quota-Fehler handelt.
+    """
+    if not is_quota_error(exc):
+        return None
+    message = str(exc)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return DEFAULT_QUOTA_DELAY_SECONDS
+
+
+class TokenBucketLimiter:
+    """Thread-sicherer Limiter mit je einem Bucket für Requests und Tokens."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.tokens_per_minute = int(tokens_per_minute) if tokens_per_minute else None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._request_tokens = float(self.requests_per_minute)
+        self._token_tokens = float(self.tokens_per_minute or 0)
+        self._last_refill = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._last_refill)
+        self._last_refill = now
+        self._request_tokens = min(
+            float(self.requests_per_minute),
+            self._request_tokens + elapsed * self.requests_per_minute / 60.0,
+        )
+        if self.tokens_per_minute:
+            self._token_tokens = min(
+                float(self.tokens_per_minute),
+                self._token_tokens + elapsed * self.tokens_per_minute / 60.0,
+            )
+
+    def acquire(self, tokens=0):
+        """Blockiert, bis ein Request mit ``tokens`` Tokens erlaubt ist."""
+        if self.tokens_per_minute:
+            # Einzelne Requests größer als das TPM-Budget dürfen nicht ewig warten.
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    missing_requests = 1.0 - self._request_tokens
+                    missing_tokens = (tokens - self._token_tokens) if self.tokens_per_minute else 0.0
+                    if missing_requests <= 0 and missing_tokens <= 0:
+                        self._request_tokens -= 1.0
+                        if self.tokens_per_minute:
+                            self._token_tokens -= tokens
+                        return
+                    wait = max(
+                        missing_requests * 60.0 / self.requests_per_minute,
+                        (missing_tokens * 60.0 / self.tokens_per_minute) if missing_tokens > 0 else 0.0,
+                    )
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """Sperrt den Limiter für ``seconds`` (z. B. nach einer Quota-Antwort)."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._request_tokens = 0.0
+        logger.warning("Gemini-Quota erreicht – pausiere Anfragen für %.1fs.", seconds)
@@ -0,0 +1,242 @@
+"""In-Memory-Modell des täglichen Reports.
+
+Einträge werden in einem Durchlauf gruppiert (Kategorie → Subkategorie),
+normalisiert (Whitespace, Groß-/Kleinschreibung), dedupliziert und
+gefiltert. Markdown, HTML und Plaintext werden direkt aus dem Modell
+erzeugt; eine Datei wird nur noch zum Debuggen geschrieben.
+
+Das HTML entsteht aus festen Templates mit Inline-Styles (Mail-Clients
+ignorieren ``<style>``-Blöcke häufig); alle Texte und URLs werden escaped.
+Die Ausgabe ist deterministisch.
+"""
+
+import logging
+from datetime import date
+from html import escape
+
+logger = logging.getLogger(__name__)
+
+NO_SUBCATEGORY = "No Subcategory"
+UNCATEGORIZED = "Uncategorized"
+PLACEHOLDER_SUMMARY = "(keine Zusammenfassung verfügbar)"
+INVALID_SUMMARIES = ["n/a", "none", "null"]
+
+HTML_DOCUMENT = (
+    '<!DOCTYPE html>\n<html><body style="margin:0;padding:16px;font-family:Arial,Helvetica,sans-serif;'
+    'font-size:14px;line-height:1.5;color:#222222;">\n{body}</body></html>\n'
+)
+HTML_TITLE = '<h1 style="font-size:22px;margin:0 0 16px 0;">{title}</h1>\n'
+HTML_CATEGORY = '<h2 style="font-size:18px;margin:24px 0 8px 0;border-bottom:1px solid #dddddd;">{title}</h2>\n'
+HTML_SUBCATEGORY = '<h3 style="font-size:15px;margin:16px 0 6px 0;color:#444444;">{title}</h3>\n'
+HTML_LIST = '<ul style="margin:0 0 8px 0;padding-left:20px;">\n{items}</ul>\n'
+HTML_ITEM = (
+    '<li style="margin:0 0 6px 0;">{emoji}{summary} '
+    '(<a href="{url}" style="color:#1a0dab;">{reading_time}</a>){points}</li>\n'
+)
+HTML_POINTS = ' <span style="color:#888888;">({points} points)</span>'
+
+
+def _norm(value):
+    return " ".join(str(value or "").strip().split())
+
+
+def _has_summary(summary):
+    return bool(summary) and str(summary).strip().lower() not in INVALID_SUMMARIES
+
+
+def is_reportable_entry(details):
+    """Prüft, ob ein Eintrag im Report erscheint.
+
+    Einträge ohne verwertbare Summary und ohne Lesezeit werden nicht
+    aufgenommen und gelten daher als nicht versendet.
+    """
+    return _has_summary(details.get("summary")) or bool(details.get("reading_time"))
+
+
+class ReportEntry:
+    """Eine Zeile im Report."""
+
+    __slots__ = ("url", "summary", "reading_time", "hn_points", "is_alert")
+
+    def __init__(self, url, summary, reading_time, hn_points, is_alert):
+        self.url = url
+        self.summary = summary
+        self.reading_time = reading_time
+        self.hn_points = hn_points
+        self.is_alert = is_alert
+
+    @property
+    def reading_time_text(self):
+        return f"read in {self.reading_time} min" if self.reading_time else "read time n/a"
+
+    @property
+    def show_points(self):
+        return bool(self.hn_points) and not self.is_alert
+
+    @property
+    def emoji(self):
+        if not self.show_points:
+            return ""
+        if self.hn_points >= 200:
+            return "🚀 "
+        if self.hn_points >= 50:
+            return "🔥 "
+        return ""
+
+    def key(self):
+        return (self.summary, self.url, self.reading_time_text, self.hn_points if self.show_points else None)
+
+    def to_html(self):
+        return HTML_ITEM.format(
+            emoji=escape(self.emoji),
+            summary=escape(str(self.summary)),
+            url=escape(str(self.url), quote=True),
+            reading_time=escape(self.reading_time_text),
+            points=HTML_POINTS.format(points=escape(str(self.hn_points))) if self.show_points else "",
+        )
+
+    def to_text(self):
+        line = f"- {self.emoji}{self.summary} ({self.reading_time_text}: {self.url})"
+        if self.show_points:
+            line += f" ({self.hn_points} points)"
+        return line
+
+    def to_markdown(self):
+        line = f"- {self.emoji}{self.summary} ([{self.reading_time_text}]({self.url}))"
+        if self.show_points:
+            line += f" ({self.hn_points} points)"
+        return line
+
+
+class ReportSection:
+    """Kategorie oder Subkategorie mit Anzeigename und Einträgen."""
+
+    def __init__(self, display):
+        self.display = display
+        self.entries = []
+        self.subsections = {}
+        self._seen = set()
+
+    def add_entry(self, entry):
+        key = entry.key()
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self.entries.append(entry)
+        return True
+
+    def non_empty_subsections(self):
+        """Subabschnitte mit Einträgen; Einträge ohne Subkategorie zuerst."""
+        subsections = [sub for sub in self.subsections.values() if sub.entries]
+        return sorted(subsections, key=lambda sub: sub.display != NO_SUBCATEGORY)
+
+    def subsection(self, label, default):
+        display = _norm(label) or default
+        key = display.casefold()
+        if key not in self.subsections:
+            self.subsections[key] = ReportSection(display)
+        return self.subsections[key]
+
+
+class Report:
+    """Gruppierter, deduplizierter Report.
+
+    Kategorien und Subkategorien werden über ihren normalisierten,
+    casefold-Namen zusammengeführt; angezeigt wird die erste Schreibweise.
+    Die Reihenfolge entspricht dem ersten Auftreten.
+    """
+
+    def __init__(self, report_date=None):
+        self.report_date = report_date or date.today()
+        self._root = ReportSection(None)
+        self.skipped = 0
+        self.duplicates = 0
+
+    @classmethod
+    def from_entries(cls, entries, report_date=None):
+        """Baut den Report aus ``{url: details}``."""
+        report = cls(report_date)
+        for url, details in entries.items():
+            report.add(url, details)
+        logger.info(
+            "Report erstellt: %s Einträge in %s Kategorien (%s ohne Summary übersprungen, %s Duplikate).",
+            len(report), len(report.categories), report.skipped, report.duplicates,
+        )
+        return report
+
+    def add(self, url, details):
+        """Fügt einen Eintrag hinzu; gibt ``False`` zurück, wenn er gefiltert wurde."""
+        # Abschnitte auch für gefilterte Einträge anlegen, damit die
+        # Reihenfolge dem ersten Auftreten entspricht; leere werden nicht gerendert.
+        category = self._root.subsection(details.get("category"), UNCATEGORIZED)
+        subcategory = category.subsection(details.get("sub_category"), NO_SUBCATEGORY)
+        if not is_reportable_entry(details):
+            self.skipped += 1
+            return False
+        summary = details.get("summary")
+        entry = ReportEntry(
+            url=url,
+            summary=summary if _has_summary(summary) else PLACEHOLDER_SUMMARY,
+            reading_time=details.get("reading_time"),
+            hn_points=details.get("hn_points"),
+            is_alert=details.get("source") == "alerts",
+        )
+        if not subcategory.add_entry(entry):
+            self.duplicates += 1
+            return False
+        return True
+
+    @property
+    def categories(self):
+        """Kategorien mit mindestens einem Eintrag."""
+        return [category for category in self._root.subsections.values() if category.non_empty_subsections()]
+
+    def __len__(self):
+        return sum(len(sub.entries) for category in self.categories for sub in category.subsections.values())
+
+    @property
+    def title(self):
+        return f"News of the Day ({self.report_date})"
+
+    def to_markdown(self):
+        lines = [f"# {self.title}", ""]
+        for category in self.categories:
+            lines += [f"## {category.display}", ""]
+            for sub in category.non_empty_subsections():
+                if sub.display != NO_SUBCATEGORY:
+                    lines += [f"### {sub.display}", ""]
+                lines += [entry.to_markdown() for entry in sub.entries]
+                lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def to_html(self):
+        """Rendert den Report als HTML-Mail-Body mit Inline-Styles."""
+        parts = [HTML_TITLE.format(title=escape(self.title))]
+        for category in self.categories:
+            parts.append(HTML_CATEGORY.format(title=escape(category.display)))
+            for sub in category.non_empty_subsections():
+                if sub.display != NO_SUBCATEGORY:
+                    parts.append(HTML_SUBCATEGORY.format(title=escape(sub.display)))
+                parts.append(HTML_LIST.format(items="".join(entry.to_html() for entry in sub.entries)))
+        return HTML_DOCUMENT.format(body="".join(parts))
+
+    def to_text(self):
+        """Rendert den Report als Plaintext (Alternative zum HTML-Teil)."""
+        lines = [self.title, "=" * len(self.title), ""]
+        for category in self.categories:
+            lines += [category.display, "-" * len(category.display), ""]
+            for sub in category.non_empty_subsections():
+                if sub.display != NO_SUBCATEGORY:
+                    lines += [f"{sub.display}:", ""]
+                lines += [entry.to_text() for entry in sub.entries]
+                lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def write_markdown(self, path):
+        """Schreibt den Report als Markdown-Datei (nur für Debugging)."""
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.to_markdown())
+            logger.info("Markdown-Report geschrieben: %s", path)
+        except Exception as e:
+            logger.error("Fehler beim Schreiben des Markdown-Reports: %s", e, exc_info=True)
@@ -0,0 +1,78 @@
+"""Tests für den Token-Budget-Planer aus ``functions/sendmail/batch_planner.py``."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "functions", "sendmail"))
+
+from batch_planner import BatchPlanner  # noqa: E402
+
+
+def make_planner(max_input=100, max_output=100, base=0, max_items=None, output=None):
+    # Items sind (Name, Input-Tokens, Output-Tokens)
+    return BatchPlanner(
+        max_input_tokens=max_input,
+        max_output_tokens=max_output,
+        base_input_tokens=base,
+        input_tokens=lambda item: item[1],
+        output_tokens=output or (lambda item: item[2]),
+        max_items=max_items,
+    )
+
+
+def names(batches):
+    return [[item[0] for item in batch.items] for batch in batches]
+
+
+def test_plan_keeps_input_order():
+    items = [(f"u{i}", 10, 10) for i in range(25)]
+    batches = make_planner().plan(items)
+    assert [item for batch in batches for item in batch.items] == items
+
+
+def test_item_exceeding_input_budget_starts_next_batch():
+    items = [("a", 40, 0), ("b", 40, 0), ("c", 30, 0)]
+    batches = make_planner(max_input=100, base=10).plan(items)
+    assert names(batches) == [["a", "b"], ["c"]]
+    assert batches[0].input_tokens == 90
+    assert batches[1].input_tokens == 40
+
+
+def test_item_exceeding_output_budget_starts_next_batch():
+    items = [("a", 1, 60), ("b", 1, 40), ("c", 1, 1)]
+    batches = make_planner(max_output=100).plan(items)
+    assert names(batches) == [["a", "b"], ["c"]]
+    assert batches[0].output_tokens == 100
+
+
+def test_max_items_is_enforced():
+    items = [(f"u{i}", 1, 1) for i in range(7)]
+    batches = make_planner(max_items=3).plan(items)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+
+def test_oversize_item_gets_own_batch_and_is_not_dropped():
+    items = [("a", 10, 0), ("huge", 500, 0), ("b", 10, 0)]
+    batches = make_planner(max_input=100).plan(items)
+    assert names(batches) == [["a"], ["huge"], ["b"]]
+    assert batches[1].input_utilisation > 1
+
+
+def test_split_halves_batch():
+    items = [(f"u{i}", 1, 1) for i in range(6)]
+    planner = make_planner()
+    (batch,) = planner.plan(items)
+    halves = planner.split(batch)
+    assert names(halves) == [["u0", "u1", "u2"], ["u3", "u4", "u5"]]
+
+
+def test_split_never_returns_empty_half():
+    planner = make_planner()
+    for count in (1, 2, 3):
+        (batch,) = planner.plan([(f"u{i}", 1, 1) for i in range(count)])
+        parts = planner.split(batch)
+        assert all(len(part) > 0 for part in parts)
+        assert sum(len(part) for part in parts) == count
+    (single,) = planner.plan([("only", 1, 1)])
+    assert planner.split(single) == [single]
@@ -0,0 +1,49 @@
+"""Tests für ``functions/podcast/content_extractor.py`` gegen den Fixture-Korpus."""
+
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "functions", "podcast"))
+
+from content_extractor import extract_main_text  # noqa: E402
+
+CORPUS = Path(ROOT) / "tools" / "fixtures" / "extractor_corpus"
+PAGES = sorted(CORPUS.glob("*.html"))
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def recall(extracted, gold):
+    extracted_tokens = Counter(t.lower() for t in TOKEN.findall(extracted))
+    gold_tokens = Counter(t.lower() for t in TOKEN.findall(gold))
+    return sum((extracted_tokens & gold_tokens).values()) / sum(gold_tokens.values())
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_fixture_pages_yield_main_text(page):
+    text = extract_main_text(page.read_bytes())
+    assert text.strip(), f"{page.name}: kein Text extrahiert"
+    assert recall(text, page.with_suffix(".txt").read_text(encoding="utf-8")) >= 0.9
+
+
+def test_div_layout_is_extracted():
+    text = extract_main_text((CORPUS / "div_layout.html").read_bytes())
+    assert "digitalen automatischen Kupplung" in text
+    assert "Wetter heute" not in text
+
+
+def test_falls_back_to_container_text_without_paragraphs():
+    assert extract_main_text(b"<html><body><span>Nur Inline-Text</span></body></html>") == "Nur Inline-Text"
+
+
+def test_sendmail_and_podcast_share_the_same_extractor():
+    # Beide Functions schreiben in content_cache; unterschiedliche Extraktoren
+    # würden den gecachten Text von der Reihenfolge der Läufe abhängig machen.
+    podcast = Path(ROOT, "functions", "podcast", "content_extractor.py").read_bytes()
+    sendmail = Path(ROOT, "functions", "sendmail", "content_extractor.py").read_bytes()
+    assert podcast == sendmail
@@ -0,0 +1,81 @@
+"""Misst Kalt- vs. Warmstart des Gmail-Clients.
+
+Kaltstart: Cache geleert, Token wird geparst und der Client aus dem
+statischen Discovery-Dokument gebaut. Warmstart: gecachter Client.
+Zum Vergleich wird außerdem der frühere Pfad (Client bei jedem Versand neu
+bauen) gemessen.
+
+Ohne ``GMAIL_TOKEN_JSON`` wird ein Dummy-Token mit Ablauf in einer Stunde
+verwendet; es findet kein Netzwerkzugriff statt.
+
+Aufruf:
+    python tools/benchmark_gmail_client.py [--runs 20]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "functions", "sendmail"))
+
+
+def _dummy_token():
+    expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+    return json.dumps({
+        "token": "dummy-access-token",
+        "refresh_token": "dummy-refresh-token",
+        "client_id": "dummy.apps.googleusercontent.com",
+        "client_secret": "dummy-secret",
+        "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    })
+
+
+def _measure(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label, timings):
+    print(f"{label:<28} Median {statistics.median(timings):8.2f} ms   "
+          f"Min {min(timings):8.2f} ms   Max {max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("GMAIL_TOKEN_JSON", _dummy_token())
+
+    import_start = time.perf_counter()
+    import mail_report_helpers as helpers
+    print(f"Import mail_report_helpers: {(time.perf_counter() - import_start) * 1000:.2f} ms")
+
+    def cold():
+        helpers.reset_gmail_service()
+        helpers.get_gmail_service()
+
+    from googleapiclient.discovery import build
+
+    def uncached():
+        creds = helpers._load_gmail_credentials()
+        helpers._ensure_valid(creds)
+        build("gmail", "v1", credentials=creds, static_discovery=True, cache_discovery=False)
+
+    _report("Ohne Cache (pro Versand)", _measure(uncached, args.runs))
+    _report("Kaltstart (Cache leer)", _measure(cold, args.runs))
+    helpers.get_gmail_service()
+    _report("Warmstart (gecacht)", _measure(helpers.get_gmail_service, args.runs))
+
+
+if __name__ == "__main__":
+    main()
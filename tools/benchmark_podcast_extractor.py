@@ -0,0 +1,141 @@
+"""Vergleicht die Podcast-Textextraktion (lxml + Readability) mit dem alten Ansatz.
+
+Alt: BeautifulSoup, ``find_all(['p', 'article', 'h1', 'h2', 'h3'])`` –
+Text in ``<article>`` wird zusätzlich pro ``<p>`` gezählt.
+Neu: ``functions/podcast/content_extractor.extract_main_text``.
+
+Korpus: Verzeichnis mit gespeicherten Seiten (``*.html``). Liegt neben einer
+Seite eine ``<name>.txt`` mit dem erwarteten Haupttext, wird zusätzlich
+Token-Precision/-Recall/-F1 berechnet. Standard ist der eingecheckte
+Fixture-Korpus unter ``tools/fixtures/extractor_corpus`` (Nachrichtenseite mit
+Werbung/Kommentaren, Blogpost mit Sidebar, Div-Layout ohne ``<p>``).
+
+Exit-Code: 0 = OK, 1 = der neue Extraktor liefert für mindestens eine Seite
+keinen Text (solche Quellen fielen sonst stillschweigend aus dem Podcast).
+
+Aufruf:
+    python tools/benchmark_podcast_extractor.py
+    python tools/benchmark_podcast_extractor.py --corpus corpus/
+    python tools/benchmark_podcast_extractor.py --corpus corpus/ --fetch urls.txt
+"""
+
+import os
+import re
+import sys
+import time
+import hashlib
+import argparse
+import statistics
+from collections import Counter
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "functions", "podcast"))
+DEFAULT_CORPUS = Path(ROOT) / "tools" / "fixtures" / "extractor_corpus"
+
+from content_extractor import extract_main_text  # noqa: E402
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def legacy_extract(html):
+    """Bisherige Extraktion aus `PodcastAIService.fetch_raw_content`."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    text = " ".join([p.get_text() for p in soup.find_all(["p", "article", "h1", "h2", "h3"])])
+    return text.replace("\n", " ").strip()
+
+
+def fetch_corpus(urls_file, corpus_dir):
+    """Speichert die Seiten aus ``urls_file`` (eine URL pro Zeile) im Korpus."""
+    import requests
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    for url in Path(urls_file).read_text(encoding="utf-8").split():
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        try:
+            response = session.get(url, timeout=15)
+            response.raise_for_status()
+            (corpus_dir / f"{name}.html").write_bytes(response.content)
+            print(f"gespeichert: {url} -> {name}.html")
+        except Exception as e:
+            print(f"FEHLER: {url}: {e}")
+
+
+def duplicate_ratio(text, size=8):
+    """Anteil wiederholter Wort-8-Gramme (unabhängig von Satzgrenzen)."""
+    words = TOKEN.findall(text.lower())
+    shingles = [tuple(words[i:i + size]) for i in range(len(words) - size + 1)]
+    if not shingles:
+        return 0.0
+    counts = Counter(shingles)
+    return sum(c - 1 for c in counts.values()) / len(shingles)
+
+
+def token_f1(extracted, gold):
+    extracted_tokens = Counter(t.lower() for t in TOKEN.findall(extracted))
+    gold_tokens = Counter(t.lower() for t in TOKEN.findall(gold))
+    overlap = sum((extracted_tokens & gold_tokens).values())
+    if not overlap:
+        return 0.0, 0.0, 0.0
+    precision = overlap / sum(extracted_tokens.values())
+    recall = overlap / sum(gold_tokens.values())
+    return precision, recall, 2 * precision * recall / (precision + recall)
+
+
+def run(name, extractor, pages, repeats):
+    timings, chars, duplicates, scores, empty = [], [], [], [], []
+    for page in pages:
+        html = page.read_bytes()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            text = extractor(html)
+        timings.append((time.perf_counter() - start) * 1000 / repeats)
+        chars.append(len(text))
+        if not text.strip():
+            empty.append(page.name)
+        duplicates.append(duplicate_ratio(text))
+        gold = page.with_suffix(".txt")
+        if gold.exists():
+            scores.append(token_f1(text, gold.read_text(encoding="utf-8")))
+
+    print(f"\n{name}")
+    print(f"  Zeit/Seite     Median {statistics.median(timings):8.2f} ms   Summe {sum(timings):9.1f} ms")
+    print(f"  Zeichen/Seite  Median {statistics.median(chars):8.0f}")
+    print(f"  Duplikate      Mittel {statistics.mean(duplicates) * 100:7.1f} % der 8-Gramme")
+    if scores:
+        precision, recall, f1 = (statistics.mean(values) for values in zip(*scores))
+        print(f"  Gold ({len(scores)} Seiten) Precision {precision:.3f}  Recall {recall:.3f}  F1 {f1:.3f}")
+    if empty:
+        print(f"  Ohne Text: {', '.join(empty)}")
+    return empty
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--fetch", help="Datei mit URLs, die vorher in den Korpus geladen werden")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_corpus(args.fetch, args.corpus)
+
+    pages = sorted(args.corpus.glob("*.html"))
+    if not pages:
+        print(f"FEHLER: keine *.html-Dateien in {args.corpus}")
+        return 1
+    print(f"Korpus: {len(pages)} Seiten, {args.repeats} Wiederholungen")
+
+    run("Alt (BeautifulSoup find_all)", legacy_extract, pages, args.repeats)
+    empty = run("Neu (lxml + Readability)", extract_main_text, pages, args.repeats)
+    if empty:
+        print(f"\nFEHLER: neuer Extraktor liefert 0 Zeichen für {len(empty)} Seite(n): {', '.join(empty)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Misst seriellen vs. parallelen TTS-Durchlauf gegen einen lokalen Stub-Server.
+
+Der Stub-Server antwortet auf ``POST /synthesize`` nach einer festen Latenz
+mit Dummy-Audio (Länge proportional zur Textlänge). Optional schlägt ein
+Anteil der Anfragen mit HTTP 429 fehl, um Retries zu prüfen. Verglichen
+werden der bisherige serielle Ablauf und ``TTSEngine`` aus
+``functions/podcast/tts_engine.py``; die Reihenfolge der Segmente wird
+geprüft.
+
+Aufruf:
+    python tools/benchmark_tts_engine.py [--passages 60] [--latency-ms 400] [--workers 8]
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "functions", "podcast"))
+
+from tts_engine import TTSEngine  # noqa: E402
+
+
+def start_stub_server(latency_ms, error_rate):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency_ms / 1000)
+            if random.random() < error_rate:
+                self.send_response(429)
+                self.end_headers()
+                return
+            payload = f"[{body['index']}]".encode() + b"\x00" * (len(body["text"]) * 20)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubQuotaError(RuntimeError):
+    code = 429
+
+
+def make_client(url):
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=64)
+    session.mount("http://", adapter)
+
+    def synthesize(index, text):
+        response = session.post(url, json={"index": index, "text": text}, timeout=30)
+        if response.status_code == 429:
+            raise StubQuotaError("429 RESOURCE_EXHAUSTED (stub)")
+        response.raise_for_status()
+        return response.content
+
+    return synthesize
+
+
+def check_order(segments):
+    for index, segment in enumerate(segments):
+        if not segment.startswith(f"[{index}]".encode()):
+            raise AssertionError(f"Segment {index} in falscher Reihenfolge")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passages", type=int, default=60)
+    parser.add_argument("--latency-ms", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=0, help="Quota in Requests/Minute (0 = unbegrenzt)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency_ms, args.error_rate)
+    url = f"http://127.0.0.1:{server.server_port}/synthesize"
+    synthesize = make_client(url)
+    script = [f"Passage {i}: " + "Lorem ipsum dolor sit amet. " * random.randint(5, 20) for i in range(args.passages)]
+    print(f"Stub: {url}, {args.passages} Passagen, Latenz {args.latency_ms} ms, Fehlerrate {args.error_rate:.0%}")
+
+    if args.error_rate == 0:
+        start = time.perf_counter()
+        serial = [synthesize(i, text) for i, text in enumerate(script)]
+        serial_time = time.perf_counter() - start
+        check_order(serial)
+        print(f"Seriell:             {serial_time:7.2f} s")
+    else:
+        serial_time = None
+
+    engine = TTSEngine(synthesize, max_workers=args.workers, requests_per_minute=args.rpm,
+                       max_retries=5, retry_base_seconds=0.2)
+    start = time.perf_counter()
+    parallel = list(engine.run(script))
+    parallel_time = time.perf_counter() - start
+    check_order(parallel)
+    print(f"TTSEngine ({args.workers} Worker): {parallel_time:7.2f} s, {engine.retries} Retries, Reihenfolge OK")
+    if serial_time:
+        print(f"Speed-up:            {serial_time / parallel_time:7.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Misst die Import-Zeit (Kaltstart-Anteil) jeder Cloud Function per ``-X importtime``.
+
+Für jede Function wird ``python -X importtime -c "import main"`` in einem
+frischen Prozess im Function-Verzeichnis ausgeführt (wie beim Kaltstart,
+ohne Credentials oder Netzwerkzugriff). Gemessen wird die kumulative Zeit
+von ``main``; der Median über ``--repeat`` Läufe wird mit dem Budget der
+Function verglichen. Zusätzlich werden die teuersten Importe bis Tiefe 2
+ausgegeben, damit neue schwere Top-Level-Importe sofort auffallen.
+
+Die Budgets sind Richtwerte für die Python-3.11-Laufzeit; schwere SDKs
+(LLM, Gmail, TTS) sollen erst beim ersten Gebrauch geladen werden.
+
+Exit-Code: 0 = alle im Budget, 1 = Budget überschritten, 2 = Import fehlgeschlagen.
+
+Aufruf:
+    python tools/profile_imports.py [--functions sendmail podcast] [--repeat 3] [--top 10]
+    python tools/profile_imports.py --budget sendmail=400
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUNCTIONS_DIR = os.path.join(ROOT, "functions")
+
+# Kaltstart-Budget für ``import main`` in Millisekunden
+BUDGETS_MS = {
+    "alerts": 700,
+    "mastodon": 700,
+    "podcast": 800,
+    "rss": 800,
+    "sendmail": 500,
+}
+
+
+def run_importtime(function_dir):
+    """Führt ``import main`` mit ``-X importtime`` aus; gibt (Einträge, Fehler) zurück."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=function_dir,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": function_dir},
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["unbekannter Fehler"])[-1]
+    return entries, error
+
+
+def main_cumulative_ms(entries):
+    for depth, name, _, cumulative_us in entries:
+        if depth == 0 and name == "main":
+            return cumulative_us / 1000
+    return None
+
+
+def main_subtree(entries):
+    """Einträge unterhalb von ``main`` (``-X importtime`` listet Kinder vor dem Elternmodul)."""
+    for index, (depth, name, _, _) in enumerate(entries):
+        if depth == 0 and name == "main":
+            start = index
+            while start > 0 and entries[start - 1][0] > 0:
+                start -= 1
+            return entries[start:index]
+    return []
+
+
+def heaviest(entries, top, max_depth=2):
+    """Teuerste Importe bis ``max_depth`` unterhalb von ``main``."""
+    candidates = [
+        (cumulative_us, depth, name)
+        for depth, name, _, cumulative_us in main_subtree(entries)
+        if depth <= max_depth
+    ]
+    return sorted(candidates, reverse=True)[:top]
+
+
+def parse_budgets(values):
+    budgets = dict(BUDGETS_MS)
+    for value in values or []:
+        name, _, ms = value.partition("=")
+        budgets[name] = float(ms)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", nargs="+", default=sorted(BUDGETS_MS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--budget", action="append", metavar="NAME=MS", help="Budget überschreiben")
+    args = parser.parse_args()
+    budgets = parse_budgets(args.budget)
+
+    exit_code = 0
+    summary = []
+    for name in args.functions:
+        function_dir = os.path.join(FUNCTIONS_DIR, name)
+        timings, entries, error = [], [], None
+        for _ in range(args.repeat):
+            entries, error = run_importtime(function_dir)
+            if error:
+                break
+            timings.append(main_cumulative_ms(entries))
+
+        print(f"\n== {name}")
+        if error:
+            print(f"  FEHLER beim Import: {error}")
+            summary.append((name, None, budgets.get(name), "FEHLER"))
+            exit_code = max(exit_code, 2)
+            continue
+
+        median_ms = statistics.median(timings)
+        budget = budgets.get(name)
+        status = "OK" if budget is None or median_ms <= budget else "ÜBER BUDGET"
+        if status != "OK":
+            exit_code = max(exit_code, 1)
+        print(f"  import main: Median {median_ms:7.1f} ms (Läufe: {', '.join(f'{t:.0f}' for t in timings)} ms), Budget {budget} ms -> {status}")
+        for cumulative_us, depth, module in heaviest(entries, args.top):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * (depth - 1)}{module}")
+        summary.append((name, median_ms, budget, status))
+
+    print("\nFunction     Median ms   Budget ms   Status")
+    for name, median_ms, budget, status in summary:
+        median = f"{median_ms:9.1f}" if median_ms is not None else "        -"
+        print(f"{name:<12} {median}   {budget!s:>9}   {status}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())